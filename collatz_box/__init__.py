@@ -0,0 +1,62 @@
+"""
+collatz_box
+
+Python engines behind the Collatz Box Universes explorers.
+
+    rules      core rule engine (odd-only, parity and Box Universe rules)
+    tree       incremental reverse tree with subtree aggregates
+    sieve      residue-class sieve for start sweeps
+    records    record-holder search (delay, peak, glide) over start ranges
+    parity     packed parity vectors and a prefix index over them
+    geometry   XYZ coordinates and the Gilbert 3D curve
+    tiles      tiled, multi-resolution rule-space pyramid for the 3D viewers
+    server     asyncio job server for the HTML tools
+    animation  matplotlib hailstone animation (needs NumPy + matplotlib)
+
+Nothing is imported eagerly: submodules and the names below are loaded on
+first attribute access, so `import collatz_box` costs almost nothing and
+process-pool workers only import the engine they actually run.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "odd_orbit": "rules",
+    "hailstone": "rules",
+    "rule_outcome": "rules",
+    "sweep_box": "rules",
+    "strip_twos": "rules",
+    "IncrementalTree": "tree",
+    "ReverseBaseline": "tree",
+    "SubtreeStats": "tree",
+    "collatz_reverse_predecessors": "tree",
+    "ResidueSieve": "sieve",
+    "get_sieve": "sieve",
+    "default_cache_dir": "_cache",
+    "search_records": "records",
+    "ParityVector": "parity",
+    "ParityPrefixIndex": "parity",
+    "hailstone_parity": "parity",
+    "RulePyramid": "tiles",
+    "gilbert3d": "geometry",
+    "generate_xyz_coords": "geometry",
+}
+
+_SUBMODULES = ("rules", "tree", "sieve", "records", "parity", "geometry", "tiles", "server", "animation")
+
+__all__ = sorted(_EXPORTS) + list(_SUBMODULES)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _EXPORTS:
+        module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+        value = getattr(module, name)
+        globals()[name] = value  # later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return __all__
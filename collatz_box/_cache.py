@@ -0,0 +1,13 @@
+"""
+collatz_box._cache
+
+On-disk cache root shared by the sieve and tile caches:
+$COLLATZ_CACHE_DIR, or ~/.cache/collatz-box-universes.
+"""
+
+import os
+
+
+def default_cache_dir():
+    return os.environ.get("COLLATZ_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "collatz-box-universes")
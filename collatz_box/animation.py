@@ -0,0 +1,65 @@
+"""
+collatz_box.animation
+
+Hailstone sequence animation over a sweep of multipliers. NumPy and
+matplotlib are imported only when an animation is built, so importing
+this module (or the package) never pulls in GUI dependencies.
+"""
+
+from collatz_box.rules import hailstone
+
+
+def hailstone_sequence(n, divisor, multiplier, adder, max_len=1000):
+    """Hailstone sequence of at most max_len values (multiplier may be a float)."""
+    return hailstone(n, divisor, multiplier, adder, max_len - 1)[0]
+
+
+def build_animation(start_n=27, divisor=2, adder=1, multiplier_range=(2, 5), frames=60):
+    """
+    Build the FuncAnimation of hailstone sequences as the multiplier varies
+    over multiplier_range. Returns (figure, animation).
+    """
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    multiplier_values = np.linspace(*multiplier_range, frames)
+
+    fig, ax = plt.subplots()
+    line, = ax.plot([], [], lw=2)
+    title = ax.text(0.5, 1.05, '', transform=ax.transAxes, ha='center')
+
+    # Initialization function for animation
+    def init():
+        ax.set_xlim(0, 100)
+        ax.set_ylim(0, 500)
+        line.set_data([], [])
+        title.set_text('')
+        return line, title
+
+    # Update function called for each frame of animation
+    def update(frame):
+        multiplier = multiplier_values[frame]
+        seq = hailstone_sequence(start_n, divisor, multiplier, adder)
+        x = np.arange(len(seq))
+        y = seq
+        line.set_data(x, y)
+        ax.set_xlim(0, max(100, len(seq)))
+        ax.set_ylim(0, max(y) + 10)
+        title.set_text(f'Hailstone sequence with multiplier={multiplier:.2f}')
+        return line, title
+
+    ani = FuncAnimation(fig, update, frames=len(multiplier_values),
+                        init_func=init, blit=True, interval=100)
+    return fig, ani
+
+
+def main():
+    import matplotlib.pyplot as plt
+
+    fig, ani = build_animation()
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
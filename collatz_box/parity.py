@@ -0,0 +1,305 @@
+"""
+collatz_box.parity
+
+Parity vectors (the D/M path the dragon explorer and 9-net draw) packed
+one bit per step. Bit i is 1 when step i multiplies (n -> n * y + z) and 0
+when it divides, the same convention as js/collatz-dragon.js.
+
+Vectors are stored as a Python int plus a length, so a million-step orbit
+takes about 125 KB instead of a list of a million ints. Summaries use
+int.bit_count(), and comparisons use XOR plus the lowest set bit, with no
+per-element loop. ParityPrefixIndex buckets vectors by their leading bits
+for similar-trajectory lookups.
+"""
+
+DEFAULT_LEVELS = (8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class ParityVector:
+    """Immutable packed bit vector: bit i of `bits` is step i, `length` steps."""
+    __slots__ = ("bits", "length")
+
+    def __init__(self, bits=0, length=0):
+        if bits < 0 or bits.bit_length() > length:
+            raise ValueError("bits must fit in length")
+        self.bits = bits
+        self.length = length
+
+    @classmethod
+    def from_sequence(cls, sequence, divisor=2):
+        """One bit per value of an existing sequence (1 when value % divisor != 0)."""
+        packed = bytearray((len(sequence) + 7) // 8)
+        for i, value in enumerate(sequence):
+            if value % divisor:
+                packed[i >> 3] |= 1 << (i & 7)
+        return cls(int.from_bytes(packed, "little"), len(sequence))
+
+    @classmethod
+    def from_bytes(cls, data, length):
+        return cls(int.from_bytes(data, "little"), length)
+
+    @classmethod
+    def from_string(cls, text):
+        """Parse a '0101...' path, first character = step 0."""
+        return cls(int(text[::-1], 2) if text else 0, len(text))
+
+    def to_bytes(self):
+        """Little-endian packed bytes, ceil(length / 8) of them (bit i = step i)."""
+        return self.bits.to_bytes((self.length + 7) // 8, "little")
+
+    def to_string(self):
+        """'0101...' path in step order, as CycleCataloge.js builds it."""
+        return format(self.bits, "b").zfill(self.length)[::-1] if self.length else ""
+
+    # ----- container protocol -----
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("parity index out of range")
+        return (self.bits >> i) & 1
+
+    def __iter__(self):
+        bits = self.bits
+        for _ in range(self.length):
+            yield bits & 1
+            bits >>= 1
+
+    def __eq__(self, other):
+        if not isinstance(other, ParityVector):
+            return NotImplemented
+        return self.bits == other.bits and self.length == other.length
+
+    def __hash__(self):
+        return hash((self.bits, self.length))
+
+    def __repr__(self):
+        shown = self.to_string() if self.length <= 64 else self.prefix(64).to_string() + "..."
+        return f"ParityVector('{shown}', length={self.length})"
+
+    # ----- slicing and comparison -----
+
+    def prefix(self, k):
+        """First k steps."""
+        k = min(k, self.length)
+        return ParityVector(self.bits & ((1 << k) - 1), k)
+
+    def common_prefix(self, other):
+        """Number of leading steps two vectors share."""
+        limit = min(self.length, other.length)
+        diff = (self.bits ^ other.bits) & ((1 << limit) - 1)
+        if diff == 0:
+            return limit
+        return (diff & -diff).bit_length() - 1
+
+    def hamming(self, other):
+        """Positions that differ over the shorter length."""
+        limit = min(self.length, other.length)
+        return ((self.bits ^ other.bits) & ((1 << limit) - 1)).bit_count()
+
+    # ----- popcount summaries -----
+
+    def popcount(self, start=0, stop=None):
+        """Multiply steps in [start, stop)."""
+        stop = self.length if stop is None else min(stop, self.length)
+        if stop <= start:
+            return 0
+        return ((self.bits >> start) & ((1 << (stop - start)) - 1)).bit_count()
+
+    def summary(self):
+        """Step counts: length, multiply steps (ones), divide steps (zeros) and the ones ratio."""
+        ones = self.bits.bit_count()
+        return {
+            "length": self.length,
+            "ones": ones,
+            "zeros": self.length - ones,
+            "ones_ratio": ones / self.length if self.length else 0.0,
+        }
+
+
+class _BitWriter:
+    """Append-only bit buffer; runs of zeros only move the cursor."""
+    __slots__ = ("packed", "length")
+
+    def __init__(self):
+        self.packed = bytearray()
+        self.length = 0
+
+    def one(self):
+        i = self.length
+        if i >> 3 >= len(self.packed):
+            self.packed.extend(bytes((i >> 3) - len(self.packed) + 64))
+        self.packed[i >> 3] |= 1 << (i & 7)
+        self.length += 1
+
+    def zeros(self, count):
+        self.length += count
+
+    def vector(self):
+        return ParityVector(int.from_bytes(self.packed, "little"), self.length)
+
+
+# =========================================================================
+# === Engines that emit parity vectors without building the sequence
+# =========================================================================
+
+def hailstone_parity(n, divisor, multiplier, adder, max_len=1000, max_bits=None):
+    """
+    Parity path of collatz_box.rules.hailstone: one bit per step, same
+    stopping rules (1 reached, max_len steps, or max_bits exceeded).
+
+    Returns:
+        tuple: (ParityVector, final value, diverged flag)
+    """
+    out = _BitWriter()
+    while n != 1 and out.length < max_len:
+        exact = isinstance(n, int)
+        if max_bits is not None and exact and n.bit_length() > max_bits:
+            return out.vector(), n, True
+        if n % 2 == 0:
+            if divisor == 2 and exact and n != 0:
+                zeros = min((n & -n).bit_length() - 1, max_len - out.length)
+                out.zeros(zeros)
+                n >>= zeros
+                continue
+            n = n // divisor
+            out.zeros(1)
+        else:
+            n = n * multiplier + adder
+            out.one()
+    return out.vector(), n, False
+
+
+def odd_orbit_parity(a1, b, c, max_iterations=10000, max_bits=None):
+    """
+    Parity path of collatz_box.rules.odd_orbit expanded to single steps:
+    each odd step is a 1 followed by one 0 per factor of 2 stripped. Stops
+    when an odd value repeats, after max_iterations odd steps, or once the
+    bit budget is exceeded.
+
+    Returns:
+        tuple: (ParityVector, cycle value or None, diverged flag)
+    """
+    if a1 % 2 == 0:
+        raise ValueError("Starting number must be odd per generalized Collatz.")
+    out = _BitWriter()
+    seen = set()
+    current = a1
+    for _ in range(max_iterations):
+        if current in seen:
+            return out.vector(), current, False
+        if max_bits is not None and current.bit_length() > max_bits:
+            return out.vector(), None, True
+        seen.add(current)
+        d = current * b + c
+        out.one()
+        if d == 0:
+            current = 0
+            continue
+        zeros = (d & -d).bit_length() - 1
+        out.zeros(zeros)
+        current = d >> zeros
+    return out.vector(), None, False
+
+
+def rule_parity(n, x, y, z, max_iterations=10000, max_bits=None):
+    """
+    D/M path under the Box Universe rule (n mod x == 0 -> divide), as
+    generateCollatzSequence in js/collatz-dragon.js produces it. Stops at 1,
+    on a repeated value, after max_iterations, or once max_bits is exceeded.
+
+    Returns:
+        tuple: (ParityVector, status) with status "converges", "cycle",
+        "diverges" or "limit"
+    """
+    if x == 0:
+        raise ValueError("x must be non-zero.")
+    out = _BitWriter()
+    seen = set()
+    while n != 1:
+        if out.length >= max_iterations:
+            return out.vector(), "limit"
+        if max_bits is not None and n.bit_length() > max_bits:
+            return out.vector(), "diverges"
+        if n in seen:
+            return out.vector(), "cycle"
+        seen.add(n)
+        if n % x == 0:
+            n //= x
+            out.zeros(1)
+        else:
+            n = n * y + z
+            out.one()
+    return out.vector(), "converges"
+
+
+# =========================================================================
+# === Prefix index for similar-trajectory lookups
+# =========================================================================
+
+class ParityPrefixIndex:
+    """
+    Buckets vectors by their first L bits for each L in `levels`. A lookup
+    starts at the deepest level the query reaches and only compares exact
+    common prefixes within the first non-empty bucket, so similar
+    trajectories are found without scanning the whole collection.
+    """
+    def __init__(self, levels=DEFAULT_LEVELS):
+        self.levels = tuple(sorted(levels))
+        self.vectors = {}                                  # key -> ParityVector
+        self.buckets = {level: {} for level in self.levels}  # level -> prefix bits -> [keys]
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def add(self, key, vector):
+        if key in self.vectors:
+            raise ValueError(f"{key!r} is already indexed")
+        self.vectors[key] = vector
+        for level in self.levels:
+            if vector.length < level:
+                break
+            prefix = vector.bits & ((1 << level) - 1)
+            self.buckets[level].setdefault(prefix, []).append(key)
+
+    def with_prefix(self, query, level):
+        """Keys whose first `level` bits equal the query's (level must be indexed)."""
+        if query.length < level:
+            return []
+        return list(self.buckets[level].get(query.bits & ((1 << level) - 1), ()))
+
+    def nearest(self, query, limit=10, exclude=None):
+        """
+        Up to `limit` (key, common_prefix) pairs sharing the longest prefix
+        with query, best first. Buckets are widened level by level until
+        they hold enough candidates; `exclude` drops one key (e.g. the query's own).
+        """
+        candidates = None
+        for level in reversed(self.levels):
+            if query.length < level:
+                continue
+            keys = self.buckets[level].get(query.bits & ((1 << level) - 1))
+            if keys:
+                candidates = keys
+                if len(keys) - (exclude in keys) >= limit:
+                    break
+        if candidates is None:
+            candidates = self.vectors.keys()
+        scored = [(key, query.common_prefix(self.vectors[key]))
+                  for key in candidates if key != exclude]
+        scored.sort(key=lambda item: -item[1])
+        return scored[:limit]
+
+
+if __name__ == "__main__":
+    vector, _, _ = hailstone_parity(27, 2, 3, 1)
+    print(vector, vector.summary())
+
+    index = ParityPrefixIndex()
+    for start in range(1, 20000):
+        index.add(start, hailstone_parity(start, 2, 3, 1)[0])
+    print("Closest paths to 27:", index.nearest(vector, limit=5, exclude=27))
@@ -0,0 +1,229 @@
+"""
+collatz_box.records
+
+Record-holder search over a range of starts for the parity rule
+n even -> n / 2, n odd -> b * n + c (b = 3, c = 1 is standard Collatz).
+Only the starts that set a new record are emitted:
+
+    delay  total stopping time, steps until the orbit reaches 1
+    peak   largest value the orbit visits on its way to 1
+    glide  stopping time, steps until the orbit first drops below its start
+
+Starts are walked in increasing order. Delay and peak use cached tails:
+once an orbit falls below its start it lands on a start whose result is
+already known, so the walk stops there. Shortcuts:
+
+    - delay and peak: for b == 3c > 0, 8k+5 and 8k+4 both reach 2bk+b+c
+      in three steps, so 8k+5 is not walked at all: its delay is that of
+      8k+4 (it can never set a strict delay record) and its peak is that
+      of 8k+4 or b(8k+5)+c, whichever is larger.
+    - glide: once the record reaches the residue sieve's bound, only sieve
+      survivors are walked; every discarded class has a shorter glide.
+
+Ranges can be split into shards that run in parallel. Each shard reports
+its local records; merging keeps a local record only if it beats every
+earlier shard, which is exactly the global record list because any global
+record is also a record within its own shard.
+
+Orbits that do not reach 1 (or do not drop, for glide) within max_steps or
+max_bits are never records.
+"""
+
+import math
+
+from collatz_box.rules import DEFAULT_MAX_BITS
+from collatz_box.sieve import DEFAULT_K, get_sieve
+
+KINDS = ("delay", "peak", "glide")
+DEFAULT_MAX_STEPS = 100000
+PREFIX_LIMIT = 1 << 16
+
+_prefix_tails = {}   # (b, c, max_steps, max_bits) -> (delays, peaks), grown up to PREFIX_LIMIT
+
+
+def _walk(n, b, c, delays, peaks, base, max_steps, max_bits):
+    """
+    Delay and peak of n, stopping at the first value below n whose tail is
+    cached: delays[v - base] / peaks[v - base] for base <= v < n, or the
+    shared prefix table for v < PREFIX_LIMIT. Returns (None, None) when the
+    orbit does not reach 1 within the limits (max_steps counts the whole
+    orbit, cached tail included).
+    """
+    prefix_delays, prefix_peaks = _prefix_tails.get((b, c, max_steps, max_bits), ((), ()))
+    v = n
+    peak = n
+    steps = 0
+    while v != 1:
+        if v < n:
+            if v >= base:
+                d, p = delays[v - base], peaks[v - base]
+            elif v < len(prefix_delays):
+                d, p = prefix_delays[v], prefix_peaks[v]
+            else:
+                d = p = -1
+            if d is None or steps + d > max_steps:
+                return None, None
+            if d >= 0:
+                return steps + d, max(peak, p)
+        if v <= 0 or steps >= max_steps or v.bit_length() > max_bits:
+            return None, None
+        if v & 1:
+            v = b * v + c
+            if v > peak:
+                peak = v
+        else:
+            v >>= 1
+        steps += 1
+    return steps, peak
+
+
+def _ensure_prefix(b, c, max_steps, max_bits, stop):
+    """Grow the shared tail table to cover the starts below min(stop, PREFIX_LIMIT)."""
+    delays, peaks = _prefix_tails.setdefault((b, c, max_steps, max_bits), ([None], [None]))
+    stop = min(stop, PREFIX_LIMIT)
+    for n in range(len(delays), stop):
+        delays.append(None)
+        peaks.append(None)
+        delays[n], peaks[n] = _walk(n, b, c, delays, peaks, 0, max_steps, max_bits)
+
+
+def glide(n, b=3, c=1, max_steps=DEFAULT_MAX_STEPS, max_bits=DEFAULT_MAX_BITS):
+    """Steps until the orbit of n first drops below n (None if it does not)."""
+    v = n
+    for step in range(1, max_steps + 1):
+        v = b * v + c if v & 1 else v >> 1
+        if v < n:
+            return step
+        if v.bit_length() > max_bits:
+            return None
+    return None
+
+
+def glide_bound(b, k):
+    """
+    Largest glide (in parity-rule steps) of any start the sieve mod 2^k
+    discards: a class discarded after j Terras steps with o odd ones, where
+    b^o < 2^j, takes j + o parity-rule steps to drop.
+    """
+    bound = 0
+    for j in range(1, k + 1):
+        o = 0
+        while b ** (o + 1) < 2 ** j:
+            o += 1
+        bound = max(bound, j + o)
+    return bound
+
+
+def shard_records(start, stop, kind="delay", b=3, c=1, baseline=None,
+                  max_steps=DEFAULT_MAX_STEPS, max_bits=DEFAULT_MAX_BITS, k=DEFAULT_K):
+    """
+    Local records in [start, stop): starts whose value beats baseline and
+    every earlier start in the shard. Returns a list of (n, value).
+    """
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}")
+    start = max(start, 1)
+    best = baseline
+    records = []
+
+    if kind == "glide":
+        sieve = get_sieve(b, c, k) if b % 2 and c % 2 and b > 1 else None
+        bound = glide_bound(b, k) if sieve is not None else None
+        n = start
+        while n < stop:
+            if bound is not None and best is not None and best >= bound:
+                # Every skipped start has glide <= bound <= best
+                for m in sieve.starts(n, stop):
+                    value = glide(m, b, c, max_steps, max_bits)
+                    if value is not None and value > best:
+                        best = value
+                        records.append((m, value))
+                break
+            value = glide(n, b, c, max_steps, max_bits)
+            if value is not None and (best is None or value > best):
+                best = value
+                records.append((n, value))
+            n += 1
+        return records
+
+    # The shard caches its own tails; the shared table only has to cover
+    # the values an orbit can land on below start.
+    _ensure_prefix(b, c, max_steps, max_bits, start)
+    same_as_8k4 = b == 3 * c and c > 0
+    delays = [None] * (stop - start) if stop > start else []
+    peaks = [None] * len(delays)
+    pick = 0 if kind == "delay" else 1
+    for n in range(start, stop):
+        if same_as_8k4 and n & 7 == 5 and n > 8 and n - 1 >= start:
+            d, p = delays[n - 1 - start], peaks[n - 1 - start]
+            up = b * n + c
+            if d is None or up.bit_length() > max_bits:
+                result = None, None
+            else:
+                result = d, max(p, up)
+        else:
+            result = _walk(n, b, c, delays, peaks, start, max_steps, max_bits)
+        delays[n - start], peaks[n - start] = result
+        value = result[pick]
+        if value is not None and (best is None or value > best):
+            best = value
+            records.append((n, value))
+    return records
+
+
+def merge_records(shard_lists, baseline=None):
+    """Merge per-shard local records (in range order) into global records."""
+    best = baseline
+    merged = []
+    for records in shard_lists:
+        for n, value in records:
+            if best is None or value > best:
+                best = value
+                merged.append((n, value))
+    return merged
+
+
+def _run_shard(args):
+    return shard_records(*args)
+
+
+def search_records(start, stop, kind="delay", b=3, c=1, shards=1, processes=None,
+                   baseline=None, max_steps=DEFAULT_MAX_STEPS,
+                   max_bits=DEFAULT_MAX_BITS, k=DEFAULT_K):
+    """
+    Record holders in [start, stop) for kind ("delay", "peak" or "glide").
+
+    Args:
+        start, stop (int): range of starts, stop exclusive
+        kind (str): which record to track
+        b, c (int): parity rule multiplier and adder
+        shards (int): number of contiguous shards to split the range into
+        processes (int or None): worker processes; shards run in-process if 1
+        baseline (int or None): value to beat (the record below start, if known)
+
+    Returns:
+        list: (n, value) for every start that sets a new record, in order
+    """
+    start = max(start, 1)
+    if stop <= start:
+        return []
+    shards = max(1, min(shards, stop - start))
+    size = math.ceil((stop - start) / shards)
+    # Every shard gets the global baseline: anything that fails to beat it
+    # cannot be a global record anyway.
+    jobs = [(lo, min(lo + size, stop), kind, b, c, baseline, max_steps, max_bits, k)
+            for lo in range(start, stop, size)]
+    if len(jobs) == 1 or processes == 1:
+        shard_lists = [_run_shard(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            shard_lists = list(pool.map(_run_shard, jobs))
+    return merge_records(shard_lists, baseline)
+
+
+if __name__ == "__main__":
+    for kind in KINDS:
+        records = search_records(1, 1_000_000, kind, shards=4)
+        print(f"{kind} records below 10^6:", [n for n, _ in records])
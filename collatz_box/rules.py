@@ -0,0 +1,206 @@
+"""
+collatz_box.rules
+
+Core rule engine. The toolkit uses three related but distinct maps, each
+with its own entry point here so scripts stop redefining them:
+
+    odd_orbit     Rathore's odd-only map (generalized_collatz.py):
+                  n -> (b * n + c) with every factor of 2 removed
+    hailstone     parity rule of slicer.py and the hailstone animation:
+                  n even -> n // divisor, n odd -> n * multiplier + adder
+    rule_outcome  Box Universe rule of the HTML explorers (js/utils.js):
+                  n mod X == 0 -> n / X, otherwise n * Y + Z
+
+All of them work on Python ints; halving runs are taken in one shift and
+growth can be bounded by a bit-length budget (max_bits) on divergent rules.
+Only the standard library is imported, so process-pool workers start fast.
+"""
+
+DEFAULT_MAX_BITS = 4096
+
+MAX_ITERATIONS = 1000
+MAX_BITS = 53  # matches Number.MAX_SAFE_INTEGER in the browser tools
+
+CONVERGES = "Converges to 1"
+CYCLE = "Cycle Detected"
+DIVERGES = "Exceeded Max Safe Integer"
+NON_POSITIVE = "Reached Non-Positive Value"
+MAX_ITERATIONS_REACHED = "Max Iterations Reached"
+INVALID = "Invalid Parameters (X is 0)"
+
+
+def strip_twos(d):
+    """
+    Remove all factors of 2 from d in one shift.
+    d & -d isolates the lowest set bit, so its bit_length() - 1 is the
+    number of trailing zeros. Zero has no odd part and is returned as-is.
+    """
+    if d == 0:
+        return 0
+    return d >> ((d & -d).bit_length() - 1)
+
+
+# =========================================================================
+# === Rathore odd-only map
+# =========================================================================
+
+def odd_orbit(a1, b, c, max_iterations=10000, max_bits=None):
+    """
+    Iterate a -> (a * b + c) / 2^v from an odd start until a value repeats.
+
+    Args:
+        a1 (int): initial odd number
+        b (int): odd multiplier
+        c (int): odd addend
+        max_iterations (int): maximum iterations allowed
+        max_bits (int or None): bit-length budget before declaring divergence
+
+    Returns:
+        sequence (list): full list of numbers generated
+        cycle_start (int or None): index where cycle starts if found, else None
+        diverged (bool): True if the bit-length budget was exceeded
+    """
+    if a1 % 2 == 0:
+        raise ValueError("Starting number must be odd per generalized Collatz.")
+    if max_bits is not None and max_bits < 1:
+        raise ValueError("max_bits must be positive.")
+
+    sequence = []
+    seen = {}
+
+    current = a1
+    for i in range(max_iterations):
+        if current in seen:
+            return sequence, seen[current], False
+        if max_bits is not None and current.bit_length() > max_bits:
+            return sequence, None, True
+
+        seen[current] = i
+        sequence.append(current)
+
+        current = strip_twos(current * b + c)
+
+    return sequence, None, False
+
+
+# =========================================================================
+# === Parity (hailstone) rule
+# =========================================================================
+
+def hailstone(n, divisor, multiplier, adder, max_len=1000, max_bits=None):
+    """
+    Hailstone sequence under the parity rule, stopping at 1 or after
+    max_len steps (so at most max_len + 1 values).
+
+    With divisor 2 and an int value, every run of halvings is taken in one
+    shift. Non-integer multipliers (as swept by the animation) fall back to
+    plain stepping.
+
+    Args:
+        n (int): The starting number.
+        divisor (int): The divisor for even numbers.
+        multiplier (int or float): The multiplier for odd numbers.
+        adder (int): The value to add to odd numbers.
+        max_len (int): Maximum number of steps.
+        max_bits (int or None): Bit-length budget before declaring divergence.
+
+    Returns:
+        tuple: (sequence list, diverged flag)
+    """
+    sequence = [n]
+    while n != 1 and len(sequence) <= max_len:
+        exact = isinstance(n, int)
+        if max_bits is not None and exact and n.bit_length() > max_bits:
+            return sequence, True
+        if n % 2 == 0:
+            if divisor == 2 and exact and n != 0:
+                zeros = (n & -n).bit_length() - 1
+                # Stop early at 1 (a pure power of two) like the stepwise loop
+                zeros = min(zeros, max_len + 1 - len(sequence))
+                sequence.extend(n >> k for k in range(1, zeros + 1))
+                n = sequence[-1]
+                continue
+            n = n // divisor
+        else:
+            n = (n * multiplier) + adder
+        sequence.append(n)
+    return sequence, False
+
+
+# =========================================================================
+# === Box Universe rule
+# =========================================================================
+
+def rule_outcome(n, x, y, z, max_iterations=MAX_ITERATIONS, max_bits=MAX_BITS):
+    """
+    Classify the orbit of n under rule (x, y, z).
+
+    Args:
+        n (int): starting number
+        x (int): divisor
+        y (int): multiplier
+        z (int): adder
+        max_iterations (int): step limit
+        max_bits (int): bit-length budget before declaring divergence
+
+    Returns:
+        dict: x, y, z, type (one of the outcome strings above), steps,
+        max_val and cycle_start (the first repeated value, or None)
+    """
+    result = {"x": x, "y": y, "z": z, "type": None, "steps": 0,
+              "max_val": n, "cycle_start": None}
+    if x == 0:
+        result["type"] = INVALID
+        return result
+
+    current = n
+    seen = {n}
+    steps = 0
+    while current != 1 and steps < max_iterations:
+        if current % x == 0:
+            current //= x
+        else:
+            current = current * y + z
+        steps += 1
+
+        if current <= 0:
+            result["type"] = NON_POSITIVE
+            break
+        if current.bit_length() > max_bits:
+            result["type"] = DIVERGES
+            break
+        if current in seen:
+            result["type"] = CYCLE
+            result["cycle_start"] = current
+            break
+        seen.add(current)
+        if current > result["max_val"]:
+            result["max_val"] = current
+    else:
+        result["type"] = CONVERGES if current == 1 else MAX_ITERATIONS_REACHED
+
+    result["steps"] = steps
+    return result
+
+
+def sweep_box(n, x_range, y_range, z_range, max_iterations=MAX_ITERATIONS, max_bits=MAX_BITS):
+    """
+    Yield rule_outcome for every (x, y, z) in the box, x-major like js/worker.js.
+    Ranges are any iterables of ints; rules with x == 0 are still reported
+    (as invalid) so the caller sees one record per cell.
+    """
+    for x in x_range:
+        for y in y_range:
+            for z in z_range:
+                yield rule_outcome(n, x, y, z, max_iterations, max_bits)
+
+
+def sweep_slice(n, x, y_values, z_values, max_iterations=MAX_ITERATIONS, max_bits=MAX_BITS):
+    """One x-slice of sweep_box as a list (a picklable process-pool work unit)."""
+    return [rule_outcome(n, x, y, z, max_iterations, max_bits)
+            for y in y_values for z in z_values]
+
+
+if __name__ == "__main__":
+    for record in sweep_box(27, range(2, 4), range(3, 6), range(1, 3)):
+        print(record)
@@ -0,0 +1,422 @@
+"""
+collatz_box.server
+
+Local asyncio job server that lets the HTML explorers offload heavy grids
+to the Python engines on a multi-core backend:
+
+    GET /sweep?n=27&x=2..9&y=1..9&z=1..9     rule-space sweep (collatz_box.rules)
+    GET /slicer?n=27&x=2&y=3&z=1&bounds=32,32,4
+                                             sequence + Gilbert 1D indices (collatz_box.geometry)
+    GET /tree?root=1&depth=20                reverse Collatz tree (collatz_box.tree)
+    GET /tile?n=27&level=0&tx=0&ty=0&tz=0    one rule-space tile, computed on demand
+                                             and kept on disk (collatz_box.tiles)
+    GET /status                              queue / cache counters
+
+Responses are streamed as newline-delimited JSON using chunked transfer
+encoding, one line per finished work unit, so a browser can consume them
+incrementally with fetch() + ReadableStream.
+
+Identical (engine, parameters) queries are coalesced onto one job, finished
+jobs are kept in an LRU result cache bounded by the size of their encoded
+responses, and the number of queued jobs is bounded: when the queue is
+full the server answers 503 instead of growing without limit. Only the standard library is used; WebSockets are not
+implemented because chunked HTTP already gives the browser a stream.
+
+Work units are plain functions from the engine modules, so process-pool
+workers only import those (stdlib-only) modules, not asyncio or this server.
+Workers also encode their results to NDJSON, so the event loop only ever
+moves bytes and every client of a job is sent the same encoded lines.
+
+Run:
+    python -m collatz_box.server --port 8765 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from collatz_box.geometry import slice_sequence
+from collatz_box.rules import MAX_BITS, MAX_ITERATIONS, sweep_slice
+from collatz_box.tiles import DEFAULT_TILE_SIZE, tile_columns
+from collatz_box.tree import tree_edges
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_QUEUED_JOBS = 32
+CACHE_BYTES = 256 << 20   # encoded NDJSON kept for finished jobs
+MAX_GRID_CELLS = 1_000_000
+MAX_TREE_DEPTH = 40
+MAX_ITERATIONS_LIMIT = 100_000
+MAX_BITS_LIMIT = 4096
+MAX_TILE_LEVEL = 3   # a level-L tile is built from 8^L level-0 tiles
+
+
+class BadRequest(ValueError):
+    """Raised for malformed query parameters; answered with HTTP 400."""
+
+
+# =========================================================================
+# === Request parsing: query -> (cache key, list of work units)
+# =========================================================================
+
+def _int(params, name, default=None):
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise BadRequest(f"missing parameter '{name}'")
+        return default
+    try:
+        return int(values[0])
+    except ValueError:
+        raise BadRequest(f"parameter '{name}' must be an integer") from None
+
+
+def _bounded(params, name, default, limit):
+    """Integer parameter in 1..limit (with a default when absent)."""
+    value = _int(params, name, default)
+    if not 1 <= value <= limit:
+        raise BadRequest(f"parameter '{name}' must be in 1..{limit}")
+    return value
+
+
+def _span(params, name):
+    """Parse 'a..b' (inclusive, like js/worker.js) or a single integer."""
+    values = params.get(name)
+    if not values:
+        raise BadRequest(f"missing parameter '{name}'")
+    lo, sep, hi = values[0].partition("..")
+    try:
+        lo = int(lo)
+        hi = int(hi) if sep else lo
+    except ValueError:
+        raise BadRequest(f"parameter '{name}' must look like 'a..b'") from None
+    if hi < lo:
+        raise BadRequest(f"parameter '{name}' is an empty range")
+    return lo, hi
+
+
+def plan_job(path, params):
+    """
+    Translate a request into a cache key and the work units to run.
+
+    Returns:
+        tuple: (key, units) where units is a list of (function, args)
+    """
+    if path == "/sweep":
+        n = _int(params, "n")
+        xs, ys, zs = _span(params, "x"), _span(params, "y"), _span(params, "z")
+        max_iterations = _bounded(params, "max_iterations", MAX_ITERATIONS, MAX_ITERATIONS_LIMIT)
+        max_bits = _bounded(params, "max_bits", MAX_BITS, MAX_BITS_LIMIT)
+        cells = (xs[1] - xs[0] + 1) * (ys[1] - ys[0] + 1) * (zs[1] - zs[0] + 1)
+        if cells > MAX_GRID_CELLS:
+            raise BadRequest(f"grid has {cells} cells, limit is {MAX_GRID_CELLS}")
+        y_values = tuple(range(ys[0], ys[1] + 1))
+        z_values = tuple(range(zs[0], zs[1] + 1))
+        key = ("sweep", n, xs, ys, zs, max_iterations, max_bits)
+        units = [(sweep_slice, (n, x, y_values, z_values, max_iterations, max_bits))
+                 for x in range(xs[0], xs[1] + 1)]
+        return key, units
+
+    if path == "/slicer":
+        n = _int(params, "n")
+        rule = (_int(params, "x", 2), _int(params, "y", 3), _int(params, "z", 1))
+        try:
+            bounds = tuple(int(v) for v in params.get("bounds", ["32,32,4"])[0].split(","))
+        except ValueError:
+            raise BadRequest("parameter 'bounds' must look like 'w,h,d'") from None
+        if len(bounds) != 3 or min(bounds) < 1:
+            raise BadRequest("parameter 'bounds' must be three positive integers")
+        cells = bounds[0] * bounds[1] * bounds[2]
+        if cells > MAX_GRID_CELLS:
+            # gilbert_index keeps one dict entry per cell of the box
+            raise BadRequest(f"bounds have {cells} cells, limit is {MAX_GRID_CELLS}")
+        key = ("slicer", n, rule, bounds)
+        return key, [(slice_sequence, (n, *rule, bounds))]
+
+    if path == "/tree":
+        root = _int(params, "root", 1)
+        depth = _int(params, "depth", 20)
+        if not 0 <= depth <= MAX_TREE_DEPTH:
+            raise BadRequest(f"parameter 'depth' must be in 0..{MAX_TREE_DEPTH}")
+        value_limit = _int(params, "value_limit", 0) or None
+        key = ("tree", root, depth, value_limit)
+        return key, [(tree_edges, (root, depth, value_limit))]
+
+    if path == "/tile":
+        n = _int(params, "n")
+        level = _int(params, "level", 0)
+        if not 0 <= level <= MAX_TILE_LEVEL:
+            raise BadRequest(f"parameter 'level' must be in 0..{MAX_TILE_LEVEL}")
+        index = (_int(params, "tx"), _int(params, "ty"), _int(params, "tz"))
+        max_iterations = _bounded(params, "max_iterations", MAX_ITERATIONS, MAX_ITERATIONS_LIMIT)
+        max_bits = _bounded(params, "max_bits", MAX_BITS, MAX_BITS_LIMIT)
+        key = ("tile", n, level, index, max_iterations, max_bits)
+        return key, [(tile_columns, (n, level, *index, DEFAULT_TILE_SIZE,
+                                     max_iterations, max_bits))]
+
+    raise LookupError(path)
+
+
+# =========================================================================
+# === Jobs, coalescing and caching
+# =========================================================================
+
+class Job:
+    """
+    A running or finished computation. Chunks (encoded NDJSON lines) are
+    appended as work units finish; any number of clients can stream them,
+    including clients that attach after the job has started (coalesced
+    requests).
+    """
+    def __init__(self, key, units):
+        self.key = key
+        self.units = units
+        self.chunks = []
+        self.nbytes = 0
+        self.error = None
+        self.done = False
+        self._changed = asyncio.Condition()
+
+    async def publish(self, chunk=None, error=None, done=False):
+        async with self._changed:
+            if chunk is not None:
+                self.chunks.append(chunk)
+                self.nbytes += len(chunk)
+            if error is not None:
+                self.error = error
+            self.done = self.done or done
+            self._changed.notify_all()
+
+    async def stream(self):
+        """Yield chunks in order, waiting for new ones until the job is done."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: sent < len(self.chunks) or self.done)
+                pending = self.chunks[sent:]
+                finished = self.done
+            for chunk in pending:
+                yield chunk
+            sent += len(pending)
+            if finished and sent == len(self.chunks):
+                return
+
+
+def _encoded(fn, args):
+    """Run one work unit in a worker and return its result as an NDJSON line."""
+    return (json.dumps(fn(*args)) + "\n").encode()
+
+
+def _warm_up():
+    """Trivial pool task used to start every worker up front."""
+    return os.getpid()
+
+
+class JobServer:
+    """Bounded job queue feeding a process pool, with coalescing and an LRU cache."""
+
+    def __init__(self, workers=None, max_queued=MAX_QUEUED_JOBS, cache_bytes=CACHE_BYTES):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue = asyncio.Queue(maxsize=max_queued)
+        self.cache = OrderedDict()   # key -> finished Job
+        self.cache_bytes = cache_bytes
+        self.cached_bytes = 0
+        self.in_flight = {}          # key -> queued or running Job
+        self.executor = None
+        self._runners = []
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "rejected": 0}
+
+    async def start(self):
+        """
+        Start the pool before any client connects. Workers come from a
+        forkserver (or are spawned where there is none, e.g. on Windows)
+        and are warmed up here, so none of them inherits (and holds open)
+        a client socket accepted later by the listener.
+        """
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _warm_up)
+                               for _ in range(self.workers)))
+        # One runner per worker keeps every core busy with whole jobs while
+        # units inside a job are fanned out to the pool as well.
+        self._runners = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._runners:
+            task.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    def submit(self, key, units):
+        """
+        Return the Job for key: cached, already in flight, or newly queued.
+        Raises asyncio.QueueFull when the queue is at capacity.
+        """
+        self.stats["requests"] += 1
+        job = self.cache.get(key)
+        if job is not None:
+            self.cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return job
+        job = self.in_flight.get(key)
+        if job is not None:
+            self.stats["coalesced"] += 1
+            return job
+        job = Job(key, units)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise
+        self.in_flight[key] = job
+        return job
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            try:
+                futures = [loop.run_in_executor(self.executor, _encoded, fn, args)
+                           for fn, args in job.units]
+                for future in futures:
+                    await job.publish(chunk=await future)
+                await job.publish(done=True)
+                self._remember(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # report to clients, do not cache failures
+                await job.publish(error=f"{type(exc).__name__}: {exc}", done=True)
+            finally:
+                self.in_flight.pop(job.key, None)
+                self.queue.task_done()
+
+    def _remember(self, job):
+        if job.nbytes > self.cache_bytes:
+            return   # would evict everything else; serve it once and drop it
+        self.cache[job.key] = job
+        self.cached_bytes += job.nbytes
+        while self.cached_bytes > self.cache_bytes:
+            _, old = self.cache.popitem(last=False)
+            self.cached_bytes -= old.nbytes
+
+    def status(self):
+        return dict(self.stats, queued=self.queue.qsize(),
+                    in_flight=len(self.in_flight), cached=len(self.cache),
+                    cached_bytes=self.cached_bytes,
+                    workers=self.workers)
+
+
+# =========================================================================
+# === Minimal HTTP/1.1 front end
+# =========================================================================
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 503: "Service Unavailable"}
+
+
+def _head(status, extra=()):
+    lines = [f"HTTP/1.1 {status} {_REASONS[status]}",
+             "Access-Control-Allow-Origin: *",
+             "Connection: close", *extra, "", ""]
+    return "\r\n".join(lines).encode("latin-1")
+
+
+async def _send_json(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write(_head(status, ("Content-Type: application/json",
+                                f"Content-Length: {len(body)}")) + body)
+    await writer.drain()
+
+
+async def _send_stream(writer, job):
+    writer.write(_head(200, ("Content-Type: application/x-ndjson",
+                             "Transfer-Encoding: chunked")))
+    async for data in job.stream():
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+    if job.error is not None:
+        data = (json.dumps({"error": job.error}) + "\n").encode()
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def make_handler(server):
+    async def handle(reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            # Drain headers; nothing in them changes the response.
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            if len(request_line) < 2:
+                return
+            method, target = request_line[0], request_line[1]
+            if method == "OPTIONS":
+                writer.write(_head(200, ("Access-Control-Allow-Methods: GET",
+                                         "Content-Length: 0")))
+                await writer.drain()
+                return
+            if method != "GET":
+                await _send_json(writer, 405, {"error": "only GET is supported"})
+                return
+
+            url = urlsplit(target)
+            if url.path == "/status":
+                await _send_json(writer, 200, server.status())
+                return
+            try:
+                key, units = plan_job(url.path, parse_qs(url.query))
+            except BadRequest as exc:
+                await _send_json(writer, 400, {"error": str(exc)})
+                return
+            except LookupError:
+                await _send_json(writer, 404, {"error": f"unknown endpoint {url.path}"})
+                return
+            try:
+                job = server.submit(key, units)
+            except asyncio.QueueFull:
+                await _send_json(writer, 503, {"error": "job queue is full, retry later"})
+                return
+            await _send_stream(writer, job)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    return handle
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None,
+                max_queued=MAX_QUEUED_JOBS, cache_bytes=CACHE_BYTES):
+    server = JobServer(workers, max_queued, cache_bytes)
+    await server.start()
+    listener = await asyncio.start_server(make_handler(server), host, port)
+    print(f"Collatz job server on http://{host}:{port} ({server.workers} workers)")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-queued", type=int, default=MAX_QUEUED_JOBS)
+    parser.add_argument("--cache-mb", type=int, default=CACHE_BYTES >> 20,
+                        help="memory for cached results, in MiB")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers,
+                          args.max_queued, args.cache_mb << 20))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,227 @@
+"""
+collatz_box.sieve
+
+Residue-class sieve for sweeps over starting numbers. Works on the Terras
+form of the generalized rule with odd multiplier b and odd addend c:
+
+    T(n) = n / 2            if n is even
+    T(n) = (b * n + c) / 2  if n is odd
+
+(b = 3, c = 1 is the standard Collatz map; the odd terms are exactly the
+ones collatz_box.rules.odd_orbit visits.)
+
+The first k parities of an orbit depend only on n mod 2^k. Writing
+n = r + 2^j * m, after j steps T^j(n) = b^o * m + T^j(r), where o is the
+number of odd steps taken. As soon as b^o < 2^j that is below n for every
+large enough m, so the whole class r mod 2^j provably drops below its start
+within j <= k steps. Those classes are discarded; the rest are "survivors"
+and are kept as a bitset over residues mod 2^k.
+
+A discarded start has stopping time <= k, a survivor has stopping time > k,
+so stopping-time and record-setter sweeps only need the survivors (plus
+the few starts below the sieve's threshold, which are always iterated).
+
+Sieves are cached on disk, keyed by (b, c, k), under $COLLATZ_CACHE_DIR or
+~/.cache/collatz-box-universes.
+"""
+
+import json
+import os
+
+from collatz_box._cache import default_cache_dir
+
+DEFAULT_K = 16
+MAX_K = 28
+_MAGIC = "collatz-residue-sieve-v1"
+
+
+class ResidueSieve:
+    """
+    Survivor bitset for rule (b, c) mod 2^k.
+
+    Attributes:
+        b, c, k (int): rule and modulus exponent
+        bits (bytearray): bit r is set when residue r survives
+        threshold (int): every discarded start n >= threshold drops below
+            itself within k steps; smaller starts must always be iterated
+    """
+    def __init__(self, b, c, k, bits, threshold):
+        self.b = b
+        self.c = c
+        self.k = k
+        self.bits = bits
+        self.threshold = threshold
+
+    @classmethod
+    def build(cls, b=3, c=1, k=DEFAULT_K):
+        """Compute the sieve by walking the residue tree one parity bit at a time."""
+        if b % 2 == 0 or c % 2 == 0:
+            raise ValueError("Sieve needs odd multiplier b and odd addend c.")
+        if not 1 <= k <= MAX_K:
+            raise ValueError(f"k must be in 1..{MAX_K}.")
+
+        bits = bytearray((1 << k) // 8 + 1)
+        threshold = 0
+        # (j, r, t, bo): r = residue mod 2^j, t = T^j(r), bo = b^(odd steps)
+        stack = [(0, 0, 0, 1)]
+        while stack:
+            j, r, t, bo = stack.pop()
+            if j == k:
+                bits[r >> 3] |= 1 << (r & 7)
+                continue
+            for bit in (0, 1):
+                r2 = r | (bit << j)
+                t2 = t + bit * bo
+                if t2 % 2:
+                    t2 = (b * t2 + c) // 2
+                    bo2 = bo * b
+                else:
+                    t2 //= 2
+                    bo2 = bo
+                step = 1 << (j + 1)
+                if bo2 < step:
+                    # T^(j+1)(r2 + step*m) = bo2*m + t2 < r2 + step*m
+                    # holds once m*(step - bo2) > t2 - r2.
+                    m = (t2 - r2) // (step - bo2) + 1 if t2 >= r2 else 0
+                    threshold = max(threshold, r2 + step * m)
+                else:
+                    stack.append((j + 1, r2, t2, bo2))
+        return cls(b, c, k, bits, threshold)
+
+    # ----- queries -----
+
+    @property
+    def modulus(self):
+        return 1 << self.k
+
+    def survives(self, n):
+        """True if n has to be iterated (survivor class or below threshold)."""
+        if n < self.threshold:
+            return True
+        r = n & (self.modulus - 1)
+        return bool(self.bits[r >> 3] >> (r & 7) & 1)
+
+    def residues(self):
+        """Surviving residues mod 2^k in increasing order."""
+        out = []
+        for byte_index, byte in enumerate(self.bits):
+            while byte:
+                low = byte & -byte
+                out.append(byte_index * 8 + low.bit_length() - 1)
+                byte ^= low
+        return out
+
+    def density(self):
+        """Fraction of residues mod 2^k that survive."""
+        return len(self.residues()) / self.modulus
+
+    def starts(self, start, stop):
+        """
+        Yield the starts in [start, stop) that need a full orbit, in
+        increasing order: everything below the threshold, then survivors only.
+        """
+        below = min(stop, max(start, self.threshold))
+        yield from range(start, below)
+        if below >= stop:
+            return
+        residues = self.residues()
+        mod = self.modulus
+        base = below - below % mod
+        while base < stop:
+            for r in residues:
+                n = base + r
+                if n >= stop:
+                    return
+                if n >= below:
+                    yield n
+            base += mod
+
+    # ----- disk cache -----
+
+    def save(self, path):
+        header = {"magic": _MAGIC, "b": self.b, "c": self.c, "k": self.k,
+                  "threshold": self.threshold}
+        # Per-process name: pool workers may save the same sieve at once
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            f.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            bits = bytearray(f.read())
+        if header.get("magic") != _MAGIC:
+            raise ValueError(f"{path} is not a residue sieve file.")
+        if len(bits) != (1 << header["k"]) // 8 + 1:
+            raise ValueError(f"{path} is truncated.")
+        return cls(header["b"], header["c"], header["k"], bits, header["threshold"])
+
+
+_loaded = {}
+
+
+def get_sieve(b=3, c=1, k=DEFAULT_K, cache_dir=None):
+    """
+    Return the sieve for (b, c, k), from memory, the disk cache, or by
+    building it (and then writing it to the cache).
+    """
+    key = (b, c, k)
+    if key in _loaded:
+        return _loaded[key]
+    directory = cache_dir or default_cache_dir()
+    path = os.path.join(directory, f"sieve_b{b}_c{c}_k{k}.bin")
+    sieve = None
+    if os.path.exists(path):
+        try:
+            sieve = ResidueSieve.load(path)
+        except (ValueError, KeyError, OSError):
+            sieve = None
+    if sieve is None or (sieve.b, sieve.c, sieve.k) != key:
+        sieve = ResidueSieve.build(b, c, k)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            sieve.save(path)
+        except OSError:
+            pass  # a read-only cache only costs a rebuild next time
+    _loaded[key] = sieve
+    return sieve
+
+
+# =========================================================================
+# === Sweeps that only iterate survivors
+# =========================================================================
+
+def stopping_time(n, b=3, c=1, max_steps=10000):
+    """
+    Terras stopping time: number of T steps until the orbit drops below n.
+    Returns None if that does not happen within max_steps.
+    """
+    current = n
+    for step in range(1, max_steps + 1):
+        if current % 2:
+            current = (b * current + c) // 2
+        else:
+            current //= 2
+        if current < n:
+            return step
+    return None
+
+
+def sweep_stopping_times(start, stop, b=3, c=1, k=DEFAULT_K, max_steps=10000, sieve=None):
+    """
+    Yield (n, stopping_time) for the starts in [start, stop) that the sieve
+    cannot discard. Every skipped start has stopping time <= k.
+    """
+    sieve = sieve or get_sieve(b, c, k)
+    for n in sieve.starts(max(start, 1), stop):
+        yield n, stopping_time(n, b, c, max_steps)
+
+
+if __name__ == "__main__":
+    sieve = get_sieve(3, 1, 16)
+    print(f"3n+1 mod 2^16: {sieve.density():.2%} of residues survive, threshold {sieve.threshold}")
+    survivors = sum(1 for _ in sweep_stopping_times(1, 1_000_000, sieve=sieve))
+    print(f"Starts below 10^6 needing a full orbit: {survivors}")
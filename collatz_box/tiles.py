@@ -0,0 +1,382 @@
+"""
+collatz_box.tiles
+
+Tiled, multi-resolution precomputation of rule space for a fixed start, for
+the 3D rule viewers (box-universe-viewer.html, chaosSlicer.html). Every
+rule (X, Y, Z) gets an outcome code, its step count and, for cycles, a
+cycle id: the smallest value on the cycle, so ids agree across tiles.
+
+Rule space is cut into cubic tiles of `size` cells per side. A level-0
+cell is one rule. A level-L cell (i, j, k) of tile (tx, ty, tz) covers
+the 2^L rules per axis starting at ((tx*size + i) * 2^L,
+(ty*size + j) * 2^L, (tz*size + k) * 2^L), and summarises the 2x2x2
+block of level-(L-1) cells below it:
+
+    code       the most common outcome in the block (ties: lowest code)
+    steps      largest step count in the block
+    min_steps  smallest step count in the block
+    cycle id   the most common cycle among the block's cycles, when the
+               dominant outcome is a cycle
+
+Coarse tiles are therefore summaries of the rules underneath, not a
+sparse sample of them (which would only ever see even multipliers and
+adders). A level-L tile covers the same rule box as 8^L level-0 tiles
+and needs all of them the first time it is built.
+
+Tiles are zlib-compressed files under <root>/<level>/<tx>_<ty>_<tz>.tile.
+They are computed lazily the first time they are requested, so zooming and
+panning only ever touch the tiles in view. build() precomputes a whole box,
+with the level-0 tiles computed in parallel.
+"""
+
+import json
+import math
+import os
+import sys
+import zlib
+from array import array
+
+from collatz_box._cache import default_cache_dir
+from collatz_box.rules import (CONVERGES, CYCLE, DIVERGES, INVALID, MAX_BITS,
+                               MAX_ITERATIONS, MAX_ITERATIONS_REACHED, NON_POSITIVE,
+                               rule_outcome)
+
+DEFAULT_TILE_SIZE = 16
+_MAGIC = "collatz-rule-tile-v2"
+
+OUTCOME_CODES = {
+    CONVERGES: 0,
+    CYCLE: 1,
+    DIVERGES: 2,
+    NON_POSITIVE: 3,
+    MAX_ITERATIONS_REACHED: 4,
+    INVALID: 5,
+}
+OUTCOME_NAMES = {code: name for name, code in OUTCOME_CODES.items()}
+NO_CYCLE = 0xFFFF
+
+
+def _cycle_min(value, x, y, z):
+    """Smallest value on the cycle through `value` under rule (x, y, z)."""
+    smallest = current = value
+    while True:
+        current = current // x if current % x == 0 else current * y + z
+        if current == value:
+            return smallest
+        smallest = min(smallest, current)
+
+
+class Tile:
+    """
+    One size^3 block of rule space at a given level, stored column-wise
+    (x-major, then y, then z, like collatz_box.rules.sweep_box).
+
+    Attributes:
+        codes (bytearray): outcome code per cell (see OUTCOME_CODES)
+        steps (array 'I'): steps taken per cell (largest in the cell's block)
+        min_steps (array 'I'): smallest step count in the cell's block
+        cycle_ids (array 'H'): index into `cycles`, or NO_CYCLE
+        cycles (list): cycle ids (smallest value on each cycle) seen in the tile
+    """
+    def __init__(self, level, index, size, codes, steps, cycle_ids, cycles, min_steps=None):
+        self.level = level
+        self.index = index
+        self.size = size
+        self.codes = codes
+        self.steps = steps
+        self.min_steps = steps if min_steps is None else min_steps
+        self.cycle_ids = cycle_ids
+        self.cycles = cycles
+
+    @property
+    def stride(self):
+        return 1 << self.level
+
+    def rule(self, i, j, k):
+        """Lowest rule (x, y, z) of the block cell (i, j, k) covers."""
+        tx, ty, tz = self.index
+        s = self.size
+        return ((tx * s + i) * self.stride, (ty * s + j) * self.stride, (tz * s + k) * self.stride)
+
+    def cell(self, i, j, k):
+        """(code, steps, cycle id or None) for cell (i, j, k)."""
+        c = (i * self.size + j) * self.size + k
+        cycle = self.cycle_ids[c]
+        return self.codes[c], self.steps[c], None if cycle == NO_CYCLE else self.cycles[cycle]
+
+    def to_dict(self):
+        """JSON-friendly columns for the browser (cycle ids as strings, they can exceed 2^53)."""
+        return {
+            "level": self.level,
+            "index": list(self.index),
+            "size": self.size,
+            "stride": self.stride,
+            "codes": list(self.codes),
+            "steps": self.steps.tolist(),
+            "min_steps": self.min_steps.tolist(),
+            "cycle_ids": self.cycle_ids.tolist(),
+            "cycles": [str(c) for c in self.cycles],
+        }
+
+    # ----- disk format: JSON header + zlib(codes | steps | min_steps | cycle_ids) -----
+
+    def to_bytes(self):
+        steps, min_steps = array("I", self.steps), array("I", self.min_steps)
+        cycle_ids = array("H", self.cycle_ids)
+        if sys.byteorder == "big":
+            for column in (steps, min_steps, cycle_ids):
+                column.byteswap()
+        header = {"magic": _MAGIC, "level": self.level, "index": list(self.index),
+                  "size": self.size, "cycles": [str(c) for c in self.cycles]}
+        payload = bytes(self.codes) + steps.tobytes() + min_steps.tobytes() + cycle_ids.tobytes()
+        return json.dumps(header).encode() + b"\n" + zlib.compress(payload)
+
+    @classmethod
+    def from_bytes(cls, data):
+        head, _, body = data.partition(b"\n")
+        header = json.loads(head)
+        if header.get("magic") != _MAGIC:
+            raise ValueError("not a rule tile")
+        cells = header["size"] ** 3
+        payload = zlib.decompress(body)
+        steps, min_steps, cycle_ids = array("I"), array("I"), array("H")
+        width = cells * steps.itemsize
+        steps.frombytes(payload[cells:cells + width])
+        min_steps.frombytes(payload[cells + width:cells + 2 * width])
+        cycle_ids.frombytes(payload[cells + 2 * width:])
+        if sys.byteorder == "big":
+            for column in (steps, min_steps, cycle_ids):
+                column.byteswap()
+        return cls(header["level"], tuple(header["index"]), header["size"],
+                   bytearray(payload[:cells]), steps, cycle_ids,
+                   [int(c) for c in header["cycles"]], min_steps)
+
+
+def compute_tile(n, index, size=DEFAULT_TILE_SIZE,
+                 max_iterations=MAX_ITERATIONS, max_bits=MAX_BITS):
+    """Classify every rule in one level-0 tile (a picklable process-pool work unit)."""
+    cells = size ** 3
+    codes = bytearray(cells)
+    steps = array("I", bytes(4 * cells))
+    cycle_ids = array("H", [NO_CYCLE]) * cells
+    cycles = []
+    cycle_index = {}
+    tile = Tile(0, tuple(index), size, codes, steps, cycle_ids, cycles)
+    c = 0
+    for i in range(size):
+        for j in range(size):
+            for k in range(size):
+                x, y, z = tile.rule(i, j, k)
+                result = rule_outcome(n, x, y, z, max_iterations, max_bits)
+                codes[c] = OUTCOME_CODES[result["type"]]
+                steps[c] = result["steps"]
+                if result["type"] == CYCLE:
+                    smallest = _cycle_min(result["cycle_start"], x, y, z)
+                    if smallest not in cycle_index:
+                        cycle_index[smallest] = len(cycles)
+                        cycles.append(smallest)
+                    cycle_ids[c] = cycle_index[smallest]
+                c += 1
+    return tile
+
+
+def child_tiles(index):
+    """Indices of the 8 level-(L-1) tiles under level-L tile `index`."""
+    tx, ty, tz = index
+    return [(2 * tx + a, 2 * ty + b, 2 * tz + c)
+            for a in (0, 1) for b in (0, 1) for c in (0, 1)]
+
+
+def combine_tiles(level, index, size, children):
+    """
+    Level-`level` tile built from its level-(level-1) children, given as a
+    dict {child index: Tile} (see child_tiles). Each cell summarises its
+    2x2x2 block of child cells as described in the module docstring.
+    """
+    cells = size ** 3
+    codes = bytearray(cells)
+    steps = array("I", bytes(4 * cells))
+    min_steps = array("I", bytes(4 * cells))
+    cycle_ids = array("H", [NO_CYCLE]) * cells
+    cycles = []
+    cycle_index = {}
+    origin = [2 * t * size for t in index]
+    c = 0
+    for i in range(size):
+        for j in range(size):
+            for k in range(size):
+                block_codes, block_cycles = [], []
+                low, high = None, 0
+                for gx in (origin[0] + 2 * i, origin[0] + 2 * i + 1):
+                    for gy in (origin[1] + 2 * j, origin[1] + 2 * j + 1):
+                        for gz in (origin[2] + 2 * k, origin[2] + 2 * k + 1):
+                            child = children[(gx // size, gy // size, gz // size)]
+                            cc = ((gx % size) * size + gy % size) * size + gz % size
+                            code = child.codes[cc]
+                            block_codes.append(code)
+                            high = max(high, child.steps[cc])
+                            low = child.min_steps[cc] if low is None else min(low, child.min_steps[cc])
+                            if code == OUTCOME_CODES[CYCLE]:
+                                block_cycles.append(child.cycles[child.cycle_ids[cc]])
+                code = min(block_codes, key=lambda v: (-block_codes.count(v), v))
+                codes[c], steps[c], min_steps[c] = code, high, low
+                if code == OUTCOME_CODES[CYCLE]:
+                    smallest = min(block_cycles, key=lambda v: (-block_cycles.count(v), v))
+                    if smallest not in cycle_index:
+                        cycle_index[smallest] = len(cycles)
+                        cycles.append(smallest)
+                    cycle_ids[c] = cycle_index[smallest]
+                c += 1
+    return Tile(level, tuple(index), size, codes, steps, cycle_ids, cycles, min_steps)
+
+
+class RulePyramid:
+    """
+    On-disk tile pyramid for start n. Parameters are recorded in
+    <root>/manifest.json; reopening a root with different parameters is an error.
+    """
+    def __init__(self, n, root=None, size=DEFAULT_TILE_SIZE,
+                 max_iterations=MAX_ITERATIONS, max_bits=MAX_BITS):
+        self.n = n
+        self.size = size
+        self.max_iterations = max_iterations
+        self.max_bits = max_bits
+        self.root = root or os.path.join(
+            default_cache_dir(), f"tiles_n{n}_s{size}_i{max_iterations}_b{max_bits}")
+        self._cache = {}   # (level, index) -> Tile, tiles loaded in this process
+
+        manifest = {"format": _MAGIC, "n": n, "size": size,
+                    "max_iterations": max_iterations, "max_bits": max_bits}
+        path = os.path.join(self.root, "manifest.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                stored = json.load(f)
+            if stored != manifest:
+                raise ValueError(f"{self.root} holds a pyramid for {stored}, not {manifest}")
+        else:
+            # Written atomically: another process may open the same root
+            os.makedirs(self.root, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, path)
+
+    def _path(self, level, index):
+        return os.path.join(self.root, str(level), "%d_%d_%d.tile" % tuple(index))
+
+    def _store(self, tile):
+        path = self._path(tile.level, tile.index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(tile.to_bytes())
+        os.replace(tmp, path)
+
+    def has_tile(self, level, index):
+        return (level, tuple(index)) in self._cache or os.path.exists(self._path(level, index))
+
+    def tile(self, level, index):
+        """
+        Load a tile, computing and storing it first if it is missing. A
+        missing coarse tile is combined from its children, which are loaded
+        (or computed) the same way.
+        """
+        key = (level, tuple(index))
+        tile = self._cache.get(key)
+        if tile is not None:
+            return tile
+        path = self._path(level, index)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                tile = Tile.from_bytes(f.read())
+        elif level == 0:
+            tile = compute_tile(self.n, index, self.size, self.max_iterations, self.max_bits)
+            self._store(tile)
+        else:
+            children = {child: self.tile(level - 1, child) for child in child_tiles(index)}
+            tile = combine_tiles(level, index, self.size, children)
+            self._store(tile)
+        self._cache[key] = tile
+        return tile
+
+    def tiles_in_view(self, level, x_range, y_range, z_range):
+        """Tile indices covering the inclusive rule ranges (lo, hi) at `level`."""
+        span = self.size << level
+        axes = [range(math.floor(lo / span), math.floor(hi / span) + 1)
+                for lo, hi in (x_range, y_range, z_range)]
+        return [(tx, ty, tz) for tx in axes[0] for ty in axes[1] for tz in axes[2]]
+
+    def view(self, level, x_range, y_range, z_range):
+        """
+        Yield (x, y, z, code, steps, cycle id) for every cell whose lowest
+        rule lies in the inclusive ranges, loading or computing only the
+        tiles in view. At level L > 0 these are the block summaries.
+        """
+        for index in self.tiles_in_view(level, x_range, y_range, z_range):
+            tile = self.tile(level, index)
+            for i in range(self.size):
+                for j in range(self.size):
+                    for k in range(self.size):
+                        x, y, z = tile.rule(i, j, k)
+                        if (x_range[0] <= x <= x_range[1] and y_range[0] <= y <= y_range[1]
+                                and z_range[0] <= z <= z_range[1]):
+                            yield (x, y, z, *tile.cell(i, j, k))
+
+    def _missing_base(self, level, index, out):
+        """Collect the missing level-0 tiles a missing tile is built from."""
+        if self.has_tile(level, index):
+            return
+        if level == 0:
+            out.append(tuple(index))
+            return
+        for child in child_tiles(index):
+            self._missing_base(level - 1, child, out)
+
+    def build(self, level, x_range, y_range, z_range, processes=None):
+        """
+        Precompute every missing tile in view at `level`: the level-0 tiles
+        underneath on a process pool, then the coarser levels from those.
+        Returns the number of level-`level` tiles built.
+        """
+        missing = [index for index in self.tiles_in_view(level, x_range, y_range, z_range)
+                   if not self.has_tile(level, index)]
+        if not missing:
+            return 0
+        base = []
+        for index in missing:
+            self._missing_base(level, index, base)
+        args = [(self.n, index, self.size, self.max_iterations, self.max_bits)
+                for index in base]
+        if processes == 1 or len(base) <= 1:
+            for a in args:
+                self._store(compute_tile(*a))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                for tile in pool.map(_compute_tile_args, args):
+                    self._store(tile)
+        for index in missing:
+            self.tile(level, index)
+        return len(missing)
+
+
+def _compute_tile_args(args):
+    return compute_tile(*args)
+
+
+def tile_columns(n, level, tx, ty, tz, size=DEFAULT_TILE_SIZE,
+                 max_iterations=MAX_ITERATIONS, max_bits=MAX_BITS):
+    """One tile of the default on-disk pyramid as JSON columns (a server work unit)."""
+    pyramid = RulePyramid(n, size=size, max_iterations=max_iterations, max_bits=max_bits)
+    return [pyramid.tile(level, (tx, ty, tz)).to_dict()]
+
+
+if __name__ == "__main__":
+    pyramid = RulePyramid(27)
+    built = pyramid.build(2, (0, 63), (0, 63), (-32, 31))
+    print(f"Built {built} level-2 tiles under {pyramid.root}")
+    counts = {}
+    for *_, code, steps, cycle in pyramid.view(2, (0, 63), (0, 63), (-32, 31)):
+        counts[OUTCOME_NAMES[code]] = counts.get(OUTCOME_NAMES[code], 0) + 1
+    print("Level-2 overview:", counts)
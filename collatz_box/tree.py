@@ -0,0 +1,454 @@
+"""
+collatz_box.tree
+
+Incremental reverse tree with dual projections (Q1/Q2), O(1) reachability
+and O(log n) subtree aggregates, plus a plain baseline for cross-checks.
+"""
+
+import random
+from collections import deque, defaultdict, namedtuple
+from fractions import Fraction
+
+class OrderList:
+    """
+    Minimal order-maintenance: each item has a 'pos' key with a rational tag.
+    Insert between neighbors by assigning midpoint Fraction to avoid FP drift.
+    """
+    def __init__(self):
+        self.seq = []          # list of node ids in order
+        self.pos = {}          # node -> Fraction position
+
+    def _mid(self, a: Fraction, b: Fraction) -> Fraction:
+        return (a + b) / 2
+
+    def append_right(self, node):
+        if not self.seq:
+            p = Fraction(0)
+        else:
+            p = self.pos[self.seq[-1]] + 1
+        self.seq.append(node)
+        self.pos[node] = p
+
+    def insert_at(self, i, new_node):
+        """Insert new_node at index i when the caller already knows it (no list scan)."""
+        if i == len(self.seq):
+            self.append_right(new_node)
+            return
+        if i == 0:
+            p = self.pos[self.seq[0]] - 1
+        else:
+            p = self._mid(self.pos[self.seq[i - 1]], self.pos[self.seq[i]])
+        self.seq.insert(i, new_node)
+        self.pos[new_node] = p
+
+    def insert_after(self, left_node, new_node):
+        self.insert_at(self.seq.index(left_node) + 1, new_node)
+
+    def insert_before(self, right_node, new_node):
+        self.insert_at(self.seq.index(right_node), new_node)
+
+    def index(self, node):
+        return self.seq.index(node)
+
+    def left_of(self, a, b):
+        return self.pos[a] < self.pos[b]
+
+
+SubtreeStats = namedtuple(
+    "SubtreeStats", "count min_value max_value max_depth stopping_time_sum")
+
+
+class _AggNode:
+    __slots__ = ("key", "value", "depth", "prio", "left", "right", "parent",
+                 "size", "vmin", "vmax", "dmax", "dsum")
+
+    def __init__(self, key, value, depth):
+        self.key = key
+        self.value = value
+        self.depth = depth
+        self.prio = random.random()
+        self.left = self.right = self.parent = None
+        self.size = 1
+        self.vmin = self.vmax = value
+        self.dmax = self.dsum = depth
+
+
+class Q2AggregateIndex:
+    """
+    Implicit treap over the Q2 order, augmented with per-range aggregates:
+    count, min/max value, max depth and sum of depths. In a reverse tree the
+    depth of a node is its stopping time to the root, so the depth sum is the
+    sum of stopping times.
+
+    Positions shift when nodes are spliced into Q2, so the treap is keyed by
+    rank (implicit) rather than by index; parent pointers give rank(node) in
+    O(log n). insert (leaf insert plus rotations) and range queries are
+    O(log n) expected.
+    """
+    def __init__(self):
+        self.root = None
+        self.nodes = {}        # tree node -> _AggNode
+
+    def __len__(self):
+        return self.root.size if self.root else 0
+
+    @staticmethod
+    def _pull(t):
+        size = 1
+        vmin = vmax = t.value
+        dmax = dsum = t.depth
+        c = t.left
+        if c is not None:
+            size += c.size
+            if c.vmin < vmin:
+                vmin = c.vmin
+            if c.vmax > vmax:
+                vmax = c.vmax
+            if c.dmax > dmax:
+                dmax = c.dmax
+            dsum += c.dsum
+        c = t.right
+        if c is not None:
+            size += c.size
+            if c.vmin < vmin:
+                vmin = c.vmin
+            if c.vmax > vmax:
+                vmax = c.vmax
+            if c.dmax > dmax:
+                dmax = c.dmax
+            dsum += c.dsum
+        t.size, t.vmin, t.vmax, t.dmax, t.dsum = size, vmin, vmax, dmax, dsum
+
+    def _rotate_up(self, t):
+        """Rotate t above its parent, keeping in-order (Q2) positions."""
+        p = t.parent
+        g = p.parent
+        if t is p.left:
+            p.left = t.right
+            if t.right is not None:
+                t.right.parent = p
+            t.right = p
+        else:
+            p.right = t.left
+            if t.left is not None:
+                t.left.parent = p
+            t.left = p
+        p.parent = t
+        t.parent = g
+        if g is None:
+            self.root = t
+        elif g.left is p:
+            g.left = t
+        else:
+            g.right = t
+        self._pull(p)
+        self._pull(t)
+
+    def insert(self, index, key, value, depth):
+        """Insert key at Q2 position `index` (0 <= index <= len)."""
+        node = _AggNode(key, value, depth)
+        self.nodes[key] = node
+        t = self.root
+        if t is None:
+            self.root = node
+            return
+        # Descend by rank and hang the new node off a leaf position
+        while True:
+            left_size = t.left.size if t.left else 0
+            if index <= left_size:
+                if t.left is None:
+                    t.left = node
+                    break
+                t = t.left
+            else:
+                index -= left_size + 1
+                if t.right is None:
+                    t.right = node
+                    break
+                t = t.right
+        node.parent = t
+        # Restore heap order on priorities, then refresh aggregates to the root
+        while node.parent is not None and node.prio > node.parent.prio:
+            self._rotate_up(node)
+        t = node.parent
+        while t is not None:
+            self._pull(t)
+            t = t.parent
+
+    def rank(self, key):
+        """Current Q2 index of key."""
+        t = self.nodes[key]
+        r = t.left.size if t.left else 0
+        while t.parent is not None:
+            if t is t.parent.right:
+                r += 1 + (t.parent.left.size if t.parent.left else 0)
+            t = t.parent
+        return r
+
+    def query(self, lo, hi):
+        """Aggregate SubtreeStats over Q2 positions [lo, hi)."""
+        acc = [0, None, None, None, 0]
+
+        def add(count, vmin, vmax, dmax, dsum):
+            acc[0] += count
+            acc[1] = vmin if acc[1] is None else min(acc[1], vmin)
+            acc[2] = vmax if acc[2] is None else max(acc[2], vmax)
+            acc[3] = dmax if acc[3] is None else max(acc[3], dmax)
+            acc[4] += dsum
+
+        def walk(t, lo, hi):
+            if t is None or hi <= 0 or lo >= t.size:
+                return
+            if lo <= 0 and hi >= t.size:
+                add(t.size, t.vmin, t.vmax, t.dmax, t.dsum)
+                return
+            left_size = t.left.size if t.left else 0
+            walk(t.left, lo, hi)
+            if lo <= left_size < hi:
+                add(1, t.value, t.value, t.depth, t.depth)
+            walk(t.right, lo - left_size - 1, hi - left_size - 1)
+
+        walk(self.root, lo, hi)
+        return SubtreeStats(*acc)
+
+
+class IncrementalTree:
+    """
+    Dual projections Q1 (left-to-right) and Q2 (right-to-left sibling order),
+    with contiguous subtree blocks in both. Supports:
+      - insert_child(parent, child, ref_sibling=None, before=True)
+      - reaches(u, v) in O(1): pos1[u] < pos1[v] and pos2[u] < pos2[v]
+      - subtree(u) as contiguous slices (O(size of subtree) to list)
+      - subtree_stats(u) / range_stats(lo, hi) in O(log n) via Q2AggregateIndex
+    """
+    def __init__(self, root):
+        self.root = root
+        self.parent = {root: None}
+        self.children = defaultdict(list)
+
+        # Projection order lists
+        self.Q1 = OrderList()
+        self.Q2 = OrderList()
+
+        # For each node, track the size of its subtree block in Q2. Absolute end
+        # indices would shift on every insert to their left; sizes only change
+        # along the ancestor chain, and the aggregate index supplies the start.
+        self._subtree_size = {}   # node -> number of nodes in its subtree
+
+        # initialize projections with root as singletons
+        self.Q1.append_right(root)
+        self.Q2.append_right(root)
+        self._subtree_size[root] = 1  # subtree of root is [0:1) initially
+
+        # Depth from the root (= stopping time in a reverse tree) and the
+        # aggregate index kept aligned with Q2.
+        self.depth = {root: 0}
+        self.agg = Q2AggregateIndex()
+        self.agg.insert(0, root, root, 0)
+
+    # ----- internal helpers -----
+
+    def _q2_delimiter_index(self, u):
+        """Return the current delimiter index (first index after u's subtree block) in Q2, O(log n)."""
+        return self.agg.rank(u) + self._subtree_size[u]
+
+    def _q2_insert_before_delimiter(self, parent, v):
+        """
+        Insert node v in Q2 just before parent's delimiter index to keep subtree contiguous.
+        Grow the subtree sizes along the ancestor chain (O(depth)) and mirror the
+        insertion in the aggregate index.
+        """
+        delim = self._q2_delimiter_index(parent)  # integer index into Q2.seq
+        # The aggregate index already gave us the position, so skip the list scan
+        self.Q2.insert_at(delim, v)
+
+        # Only blocks containing v (parent and its ancestors) grow; blocks to the
+        # right just move, which rank() in the aggregate index already reflects.
+        x = parent
+        while x is not None:
+            self._subtree_size[x] += 1
+            x = self.parent[x]
+
+        # The new node v sits at index delim and its subtree is length 1
+        self._subtree_size[v] = 1
+        self.agg.insert(delim, v, v, self.depth[v])
+
+    # ----- public API -----
+
+    def insert_child(self, parent, child, ref_sibling=None, before=True):
+        """
+        Insert `child` under `parent`.
+        Q1 rule (default): child immediately AFTER parent (or relative to a reference sibling).
+        Q2 rule: child inserted immediately BEFORE parent's delimiter (keeps subtree contiguous).
+        Also maintain sibling-reversal: children order in Q2 is reverse of Q1.
+        """
+        assert child not in self.parent, "Child already exists"
+        assert parent in self.parent, "Parent must exist"
+
+        # structure
+        self.parent[child] = parent
+        self.depth[child] = self.depth[parent] + 1
+
+        # ---- Q1 placement ----
+        if ref_sibling is None:
+            # Default: immediately after parent (local insert)
+            self.Q1.insert_after(parent, child)
+            # children list in Q1 order:
+            self.children[parent].append(child)
+        else:
+            # Insert before/after a known sibling in Q1
+            i = self.children[parent].index(ref_sibling)
+            if before:
+                self.children[parent].insert(i, child)
+            else:
+                self.children[parent].insert(i + 1, child)
+            # To place in Q1.seq near ref_sibling, we can insert before/after in sequence:
+            if before:
+                # insert child at the position just before ref_sibling in Q1
+                self.Q1.insert_before(ref_sibling, child)
+            else:
+                self.Q1.insert_after(ref_sibling, child)
+
+        # ---- Q2 placement: before parent's delimiter ----
+        self._q2_insert_before_delimiter(parent, child)
+
+        # Sibling-reversal invariant is automatic at block level because
+        # new child goes at the *right edge* (before delimiter) of the parent's subtree block in Q2,
+        # while in Q1 it appears near the parent or a chosen sibling.
+        # (If you need strict per-sibling reverse ordering, choose ref_sibling accordingly.)
+
+    def reaches(self, u, v):
+        """O(1) symbolic reachability in the projections (every node reaches itself)."""
+        return u == v or (self.Q1.left_of(u, v) and self.Q2.left_of(u, v))
+
+    def subtree_members(self, u):
+        """Return list of nodes in u's subtree as a contiguous slice of Q2 (or Q1)."""
+        # Use Q2 contiguous block: from the index of u through its subtree size
+        start = self.agg.rank(u)
+        return self.Q2.seq[start:start + self._subtree_size[u]]
+
+    def subtree_stats(self, u):
+        """
+        SubtreeStats for u's subtree in O(log n), without materializing it:
+        count, min/max node value, max depth (depth span is
+        max_depth - depth[u]) and the sum of depths (stopping times to the root).
+        """
+        start = self.agg.rank(u)
+        return self.agg.query(start, start + self._subtree_size[u])
+
+    def range_stats(self, lo, hi):
+        """SubtreeStats over an arbitrary Q2 index range [lo, hi)."""
+        return self.agg.query(lo, hi)
+
+    # ----- builders and adapters -----
+
+    @classmethod
+    def build_from_reverse(
+        cls,
+        root,
+        predecessors_fn,
+        depth_limit=None,
+        value_limit=None,
+        stop_condition=None,
+    ):
+        """
+        Build the reverse tree incrementally from root, using a predecessor generator.
+        For Collatz-reverse: preds(m) yields 2m and (m-1)/3 if valid.
+        """
+        T = cls(root)
+        depth = {root: 0}
+        seen = {root}
+        q = deque([root])
+
+        while q:
+            m = q.popleft()
+            d = depth[m]
+            if depth_limit is not None and d >= depth_limit:
+                continue
+
+            for p in predecessors_fn(m):
+                if value_limit is not None and p > value_limit:
+                    continue
+                if stop_condition and stop_condition(p):
+                    continue
+                if p in seen:
+                    # Ensure we only keep a tree (unique parent); skip if encountered
+                    continue
+                # Insert p as child of m
+                T.insert_child(m, p)
+                seen.add(p)
+                depth[p] = d + 1
+                q.append(p)
+
+        return T
+
+
+# ---------- Baseline reverse tree for cross-checks ----------
+class ReverseBaseline:
+    def __init__(self, root):
+        self.root = root
+        self.parent = {root: None}
+        self.children = defaultdict(list)
+
+    @classmethod
+    def build(cls, root, predecessors_fn, depth_limit=None, value_limit=None, stop_condition=None):
+        R = cls(root)
+        depth = {root: 0}
+        seen = {root}
+        q = deque([root])
+
+        while q:
+            m = q.popleft()
+            d = depth[m]
+            if depth_limit is not None and d >= depth_limit:
+                continue
+
+            for p in predecessors_fn(m):
+                if value_limit is not None and p > value_limit:
+                    continue
+                if stop_condition and stop_condition(p):
+                    continue
+                if p in seen:
+                    continue
+                R.parent[p] = m
+                R.children[m].append(p)
+                seen.add(p)
+                depth[p] = d + 1
+                q.append(p)
+        return R
+
+    def reaches(self, u, v):
+        # DFS from u to see if v is in its subtree
+        stack = [u]
+        while stack:
+            x = stack.pop()
+            if x == v:
+                return True
+            stack.extend(self.children[x])
+        return False
+
+
+# ---------- Example predecessor functions ----------
+
+def collatz_reverse_predecessors(m: int):
+    """Classic reverse Collatz predecessors for m >= 1."""
+    # Always even predecessor
+    yield 2 * m
+    # Odd predecessor when valid
+    # If (m-1) divisible by 3 and predecessor is odd: m ≡ 4 (mod 6)
+    if (m - 1) % 3 == 0:
+        p = (m - 1) // 3
+        if p % 2 == 1 and p > 0:
+            yield p
+
+# Example generalized hook:
+# def generalized_predecessors(m: int):
+#     yield from ...  # your rules here
+
+
+def tree_edges(root, depth_limit, value_limit=None):
+    """Reverse Collatz tree as (node, parent) records in Q2 order (a process-pool work unit)."""
+    T = IncrementalTree.build_from_reverse(root, collatz_reverse_predecessors,
+                                           depth_limit=depth_limit,
+                                           value_limit=value_limit)
+    return [{"node": u, "parent": T.parent[u]} for u in T.Q2.seq]
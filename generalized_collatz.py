@@ -17,8 +17,15 @@ Usage:
 
 Returns:
     - tuple of (full sequence list, cycle start index)
+
+For divergent rules (e.g. b=5, c=1) use generalized_collatz_bigint, which
+removes every factor of 2 in a single shift and stops once the orbit grows
+past a bit-length budget. Both wrap collatz_box.rules.odd_orbit.
 """
 
+from collatz_box.rules import DEFAULT_MAX_BITS, odd_orbit
+
+
 def generalized_collatz(a1, b, c, max_iterations=10000):
     """
     Perform the generalized Collatz iteration:
@@ -38,29 +45,23 @@ def generalized_collatz(a1, b, c, max_iterations=10000):
         sequence (list): full list of numbers generated
         cycle_start (int or None): index where cycle starts if found, else None
     """
-    if a1 % 2 == 0:
-        raise ValueError("Starting number must be odd per generalized Collatz.")
-
-    sequence = []
-    seen = {}
-
-    current = a1
-    for i in range(max_iterations):
-        if current in seen:
-            cycle_start = seen[current]
-            return sequence, cycle_start
-
-        seen[current] = i
-        sequence.append(current)
+    sequence, cycle_start, _ = odd_orbit(a1, b, c, max_iterations)
+    return sequence, cycle_start
 
-        d = current * b + c
-        while d % 2 == 0:
-            d //= 2
 
-        current = d
+def generalized_collatz_bigint(a1, b, c, max_iterations=10000, max_bits=DEFAULT_MAX_BITS):
+    """
+    Bigint-aware variant of generalized_collatz for rules whose orbits grow.
+    Each step strips all trailing zeros at once and tracks growth by bit
+    length; the orbit is declared divergent as soon as a value needs more
+    than max_bits bits, which keeps memory and time bounded.
 
-    # No cycle detected within max_iterations
-    return sequence, None
+    Returns:
+        sequence (list): full list of numbers generated
+        cycle_start (int or None): index where cycle starts if found, else None
+        diverged (bool): True if the bit-length budget was exceeded
+    """
+    return odd_orbit(a1, b, c, max_iterations, max_bits)
 
 
 if __name__ == "__main__":
@@ -76,3 +77,8 @@ if __name__ == "__main__":
         print(f"Cycle detected starting at index {cycle_start}: {seq[cycle_start:]}")
     else:
         print("No cycle detected within the iteration limit.")
+
+    # Divergent rule: 5n + 1 escapes, so bound it by bit length instead
+    seq, cycle_start, diverged = generalized_collatz_bigint(7, 5, 1, max_bits=256)
+    if diverged:
+        print(f"5n+1 from 7 diverged after {len(seq)} odd steps (> 256 bits).")
@@ -3,9 +3,13 @@
 # Copyright (c) 2018 Jakub Červený
 # This script combines the provided gilbert3d function with a generalized
 # Collatz sequence generator to demonstrate the "slicing" approach.
+# The engines live in collatz_box.rules and collatz_box.geometry.
+
+from collatz_box.geometry import generate3d, generate_xyz_coords, gilbert3d, gilbert_index, sgn
+from collatz_box.rules import DEFAULT_MAX_BITS, hailstone
 
 # =========================================================================
-# === Part 1: Generalized Collatz Sequence and XYZ Coordinate Generation
+# === Part 1: Generalized Collatz Sequence
 # =========================================================================
 
 def generalized_collatz(n, divisor, multiplier, adder):
@@ -21,211 +25,23 @@ def generalized_collatz(n, divisor, multiplier, adder):
     Returns:
         list: A list of numbers in the sequence.
     """
-    sequence = [n]
-    # The sequence stops when it reaches 1 or a repeating cycle
-    # For simplicity, we stop at 1 as a common case.
-    while n != 1:
-        if n % 2 == 0:
-            n = n // divisor
-        else:
-            n = (n * multiplier) + adder
-        sequence.append(n)
-        # Prevents infinite loops for non-converging sequences
-        if len(sequence) > 1000:
-            break
-    return sequence
+    # Stops at 1, or after 1000 steps for non-converging sequences
+    return hailstone(n, divisor, multiplier, adder)[0]
 
-def generate_xyz_coords(sequence):
+def generalized_collatz_bigint(n, divisor, multiplier, adder, max_len=1000, max_bits=DEFAULT_MAX_BITS):
     """
-    Converts a 1D Collatz sequence into 3D (x, y, z) coordinates.
-    
-    This is an illustrative, placeholder function. The specific rules for
-    mapping the sequence to XYZ coordinates would be based on your "bugs universe"
-    project. This example uses a simple mapping based on the step number and
-    the value of the number in the sequence.
-
-    Args:
-        sequence (list): The list of numbers from a Collatz sequence.
+    Bigint-aware variant of generalized_collatz for divergent rules (e.g. 5n+1):
+    halving runs are taken in one shift and the sequence is declared
+    divergent once a value needs more than max_bits bits.
 
     Returns:
-        list: A list of tuples, where each tuple is an (x, y, z) coordinate.
+        tuple: (sequence list, diverged flag)
     """
-    coords = []
-    for step, value in enumerate(sequence):
-        # x-coordinate: based on the step number
-        x = step
-        # y-coordinate: based on the number's value, scaled to prevent huge numbers
-        y = value % 100  
-        # z-coordinate: based on the number's parity (odd/even)
-        z = 0
-        if value % 2 == 0:
-            z = 1
-        else:
-            z = 2
-        coords.append((x, y, z))
-    return coords
-
-
-# =========================================================================
-# === Part 2: Gilbert 3D Curve Algorithm (from your provided code)
-# =========================================================================
-
-def sgn(x):
-    return -1 if x < 0 else (1 if x > 0 else 0)
-
-def generate3d(x, y, z,
-               ax, ay, az,
-               bx, by, bz,
-               cx, cy, cz):
-    # This is the recursive logic for the Gilbert curve.
-    w = abs(ax + ay + az)
-    h = abs(bx + by + bz)
-    d = abs(cx + cy + cz)
-
-    (dax, day, daz) = (sgn(ax), sgn(ay), sgn(az))
-    (dbx, dby, dbz) = (sgn(bx), sgn(by), sgn(bz))
-    (dcx, dcy, dcz) = (sgn(cx), sgn(cy), sgn(cz))
-
-    if h == 1 and d == 1:
-        for i in range(0, w):
-            yield(x, y, z)
-            (x, y, z) = (x + dax, y + day, z + daz)
-        return
-
-    if w == 1 and d == 1:
-        for i in range(0, h):
-            yield(x, y, z)
-            (x, y, z) = (x + dbx, y + dby, z + dbz)
-        return
-
-    if w == 1 and h == 1:
-        for i in range(0, d):
-            yield(x, y, z)
-            (x, y, z) = (x + dcx, y + dcy, z + dcz)
-        return
-
-    (ax2, ay2, az2) = (ax//2, ay//2, az//2)
-    (bx2, by2, bz2) = (bx//2, by//2, bz//2)
-    (cx2, cy2, cz2) = (cx//2, cy//2, cz//2)
-
-    w2 = abs(ax2 + ay2 + az2)
-    h2 = abs(bx2 + by2, bz2)
-    d2 = abs(cx2 + cy2, cz2)
-
-    if (w2 % 2) and (w > 2):
-       (ax2, ay2, az2) = (ax2 + dax, ay2 + day, az2 + daz)
-
-    if (h2 % 2) and (h > 2):
-       (bx2, by2, bz2) = (bx2 + dbx, by2 + dby, bz2 + dbz)
-
-    if (d2 % 2) and (d > 2):
-       (cx2, cy2, cz2) = (cx2 + dcx, cy2 + dcy, cz2 + dcz)
-
-    if (2*w > 3*h) and (2*w > 3*d):
-       yield from generate3d(x, y, z,
-                             ax2, ay2, az2,
-                             bx, by, bz,
-                             cx, cy, cz)
-
-       yield from generate3d(x+ax2, y+ay2, z+az2,
-                             ax-ax2, ay-ay2, az-az2,
-                             bx, by, bz,
-                             cx, cy, cz)
-
-    elif 3*h > 4*d:
-       yield from generate3d(x, y, z,
-                             bx2, by2, bz2,
-                             cx, cy, cz,
-                             ax2, ay2, az2)
-
-       yield from generate3d(x+bx2, y+by2, z+bz2,
-                             ax, ay, az,
-                             bx-bx2, by-by2, bz-bz2,
-                             cx, cy, cz)
-
-       yield from generate3d(x+(ax-dax)+(bx2-dbx),
-                             y+(ay-day)+(by2-dby),
-                             z+(az-daz)+(bz2-dbz),
-                             -bx2, -by2, -bz2,
-                             cx, cy, cz,
-                             -(ax-ax2), -(ay-ay2), -(az-az2))
-
-    elif 3*d > 4*h:
-       yield from generate3d(x, y, z,
-                             cx2, cy2, cz2,
-                             ax2, ay2, az2,
-                             bx, by, bz)
-
-       yield from generate3d(x+cx2, y+cy2, z+cz2,
-                             ax, ay, az,
-                             bx, by, bz,
-                             cx-cx2, cy-cy2, cz-cz2)
-
-       yield from generate3d(x+(ax-dax)+(cx2-dcx),
-                             y+(ay-day)+(cy2-dcy),
-                             z+(az-daz)+(cz2-dcz),
-                             -cx2, -cy2, -cz2,
-                             -(ax-ax2), -(ay-ay2), -(az-az2),
-                             bx, by, bz)
-    else:
-       yield from generate3d(x, y, z,
-                             bx2, by2, bz2,
-                             cx2, cy2, cz2,
-                             ax2, ay2, az2)
-
-       yield from generate3d(x+bx2, y+by2, z+bz2,
-                             cx, cy, cz,
-                             ax2, ay2, az2,
-                             bx-bx2, by-by2, bz-bz2)
-
-       yield from generate3d(x+(bx2-dbx)+(cx-dcx),
-                             y+(by2-dby)+(cy-dcy),
-                             z+(bz2-dbz)+(cz-dcz),
-                             ax, ay, az,
-                             -bx2, -by2, -bz2,
-                             -(cx-cx2), -(cy-cy2), -(cz-cz2))
-
-       yield from generate3d(x+(ax-dax)+bx2+(cx-dcx),
-                             y+(ay-day)+by2+(cy-dcy),
-                             z+(az-daz)+bz2+(cz-dcz),
-                             -cx, -cy, -cz,
-                             -(ax-ax2), -(ay-ay2), -(az-az2),
-                             bx-bx2, by-by2, bz-bz2)
-
-       yield from generate3d(x+(ax-dax)+(bx2-dbx),
-                             y+(ay-day)+(by2-dby),
-                             z+(az-daz)+(bz2-dbz),
-                             -bx2, -by2, -bz2,
-                             cx2, cy2, cz2,
-                             -(ax-ax2), -(ay-ay2), -(az-az2))
-
-def gilbert3d(width, height, depth):
-    """
-    Generalized Hilbert ('Gilbert') space-filling curve for arbitrary-sized
-    3D rectangular grids.
-    """
-
-    if width >= height and width >= depth:
-       yield from generate3d(0, 0, 0,
-                             width, 0, 0,
-                             0, height, 0,
-                             0, 0, depth)
-
-    elif height >= width and height >= depth:
-       yield from generate3d(0, 0, 0,
-                             0, height, 0,
-                             width, 0, 0,
-                             0, 0, depth)
-
-    else: # depth >= width and depth >= height
-       yield from generate3d(0, 0, 0,
-                             0, 0, depth,
-                             width, 0, 0,
-                             0, height, 0)
+    return hailstone(n, divisor, multiplier, adder, max_len, max_bits)
 
 
 # =========================================================================
-# === Part 3: Slicer Script and Demonstration
+# === Part 2: Slicer Script and Demonstration
 # =========================================================================
 
 def collatz_slicer(start_n, divisor, multiplier, adder, bounds):
@@ -256,10 +72,7 @@ def collatz_slicer(start_n, divisor, multiplier, adder, bounds):
 
     # 3. Create a mapping from (x,y,z) to 1D index
     # We create a dictionary for a fast lookup
-    width, height, depth = bounds
-    space_to_index = {}
-    for i, (x, y, z) in enumerate(gilbert3d(width, height, depth)):
-        space_to_index[(x, y, z)] = i
+    space_to_index = gilbert_index(bounds)
 
     # 4. Use the mapping to get the 1D sequence
     one_d_sequence = []
@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from generalized_collatz import generalized_collatz, generalized_collatz_bigint
+import slicer
+
+def check_matches_stepwise():
+    # Converging / cycling rules give identical results to the plain loop
+    for a1 in (1, 3, 7, 27, 97):
+        seq, cycle_start = generalized_collatz(a1, 3, 1)
+        assert generalized_collatz_bigint(a1, 3, 1) == (seq, cycle_start, False)
+    for n in (1, 6, 8, 27, 0, -8):
+        for rule in ((2, 3, 1), (2, 5, -1), (3, 3, 1)):
+            expected = slicer.generalized_collatz(n, *rule)
+            assert slicer.generalized_collatz_bigint(n, *rule, max_bits=10**6) == (expected, False), (n, rule)
+
+def check_bit_budget():
+    # 5n+1 from 7 escapes; the budget must stop it well before max_iterations
+    seq, cycle_start, diverged = generalized_collatz_bigint(7, 5, 1, max_iterations=10**6, max_bits=512)
+    assert diverged and cycle_start is None
+    assert all(v.bit_length() <= 512 for v in seq)
+    seq, diverged = slicer.generalized_collatz_bigint(7, 2, 5, 1, max_len=10**6, max_bits=512)
+    assert diverged and seq[-1].bit_length() > 512
+
+check_matches_stepwise()
+check_bit_budget()
+print("OK")
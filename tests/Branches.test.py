@@ -1,9 +1,15 @@
+import os
+import sys
 from collections import deque
 from math import isfinite
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from Branch import IncrementalTree, collatz_reverse_predecessors
+
 def assert_contiguous_Q2(tree):
     # For every node u, its subtree block in Q2 is contiguous and includes all descendants
-    for u in tree._q2_end_idx.keys():
+    for u in tree.parent:
         block = tree.subtree_members(u)
         # Every child must be in the block
         q = deque([u])
@@ -25,5 +31,27 @@ def tiny_build():
     assert T.reaches(1,4) and T.reaches(2,4) and not T.reaches(3,4)
     assert_contiguous_Q2(T)
 
+def descendants(tree, u):
+    out = [u]
+    stack = [u]
+    while stack:
+        for c in tree.children[stack.pop()]:
+            out.append(c)
+            stack.append(c)
+    return out
+
+def subtree_stats_build():
+    # Aggregates must match a brute-force scan of each subtree, including
+    # blocks that shifted right when later siblings' subtrees grew.
+    T = IncrementalTree.build_from_reverse(1, collatz_reverse_predecessors, depth_limit=16)
+    assert_contiguous_Q2(T)
+    for u in T.parent:
+        block = descendants(T, u)
+        assert sorted(T.subtree_members(u)) == sorted(block), u
+        depths = [T.depth[x] for x in block]
+        assert T.subtree_stats(u) == (len(block), min(block), max(block), max(depths), sum(depths)), u
+    assert T.range_stats(0, len(T.parent)).count == len(T.parent)
+
 tiny_build()
+subtree_stats_build()
 print("OK")
@@ -0,0 +1,50 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from collatz_box.parity import (ParityPrefixIndex, ParityVector, hailstone_parity,
+                                odd_orbit_parity, rule_parity)
+from collatz_box.rules import hailstone
+
+def check_engines_match_sequences():
+    for n in list(range(1, 2000)) + [3 * 2 ** 700 + 5]:
+        for rule in ((2, 3, 1), (2, 5, 1), (2, 5, -1)):
+            sequence, _ = hailstone(n, *rule, max_len=400)
+            vector, last, _ = hailstone_parity(n, *rule, max_len=400)
+            assert vector == ParityVector.from_sequence(sequence[:-1]), (n, rule)
+            assert last == sequence[-1]
+    # The odd-only map is the same path with halving runs expanded
+    odd_path, _, _ = odd_orbit_parity(27, 3, 1)
+    assert odd_path.prefix(111) == hailstone_parity(27, 2, 3, 1)[0]
+    # Float multipliers (as the animation sweeps them) step like hailstone
+    for rule, max_bits in (((2, 2.5, 1), None), ((2, 2.5, 1), 64), ((2, 3.0, 1), 64)):
+        sequence, _ = hailstone(27, *rule, max_len=200, max_bits=max_bits)
+        vector, last, _ = hailstone_parity(27, *rule, max_len=200, max_bits=max_bits)
+        assert vector == ParityVector.from_sequence(sequence[:-1]) and last == sequence[-1]
+    path, status = rule_parity(27, 2, 3, 1)
+    assert status == "converges" and path.summary()["ones"] == 41
+
+def check_packing_and_popcount():
+    v = ParityVector.from_string("0110100")
+    assert v.to_string() == "0110100" and list(v) == [0, 1, 1, 0, 1, 0, 0]
+    assert ParityVector.from_bytes(v.to_bytes(), len(v)) == v
+    assert v.popcount() == 3 and v.popcount(2, 5) == 2
+    w = ParityVector.from_string("0110111")
+    assert v.common_prefix(w) == 5 and v.hamming(w) == 2
+
+def check_prefix_index():
+    index = ParityPrefixIndex()
+    for n in range(1, 5000):
+        index.add(n, hailstone_parity(n, 2, 3, 1)[0])
+    query = index.vectors[27]
+    found = index.nearest(query, limit=3, exclude=27)
+    assert len(found) == 3 and 27 not in dict(found)
+    # Nothing outside the result shares a longer prefix than the worst hit
+    worst = found[-1][1]
+    assert sum(query.common_prefix(v) > worst for k, v in index.vectors.items() if k != 27) < 3
+
+check_engines_match_sequences()
+check_packing_and_popcount()
+check_prefix_index()
+print("OK")
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Glide searches build residue sieves; keep them out of the user's cache
+cache = tempfile.TemporaryDirectory()
+os.environ["COLLATZ_CACHE_DIR"] = cache.name
+
+from collatz_box.records import KINDS, search_records
+
+def brute_force(stop, kind, b=3, c=1, max_bits=None, max_steps=None):
+    best = None
+    records = []
+    for n in range(1, stop):
+        v, steps, peak, first_drop = n, 0, n, None
+        while v != 1:
+            if (max_bits is not None and v.bit_length() > max_bits) or steps == max_steps:
+                steps = peak = None
+                break
+            v = b * v + c if v & 1 else v >> 1
+            steps += 1
+            peak = max(peak, v)
+            if first_drop is None and v < n:
+                first_drop = steps
+        if steps is None:
+            continue
+        value = {"delay": steps, "peak": peak, "glide": first_drop}[kind]
+        if value is not None and (best is None or value > best):
+            best = value
+            records.append((n, value))
+    return records
+
+def check_matches_brute_force():
+    # Shard boundaries must not create or hide records
+    for kind in KINDS:
+        expected = brute_force(50000, kind)
+        assert search_records(1, 50000, kind, processes=1) == expected, kind
+        assert search_records(1, 50000, kind, shards=7, processes=1) == expected, kind
+        assert search_records(1, 50000, kind, shards=3, processes=2) == expected, kind
+
+def check_step_limit():
+    # max_steps bounds the whole orbit, including cached tails
+    for max_steps in (20, 50, 100):
+        for kind in ("delay", "peak"):
+            expected = brute_force(5000, kind, max_steps=max_steps)
+            for shards in (1, 3):
+                assert search_records(1, 5000, kind, shards=shards, processes=1,
+                                      max_steps=max_steps) == expected, (kind, max_steps)
+
+def check_divergent_rule():
+    # 5n+1: most orbits blow through the bit budget or fall into a cycle
+    # and never hold a record
+    for kind in ("delay", "peak"):
+        expected = brute_force(300, kind, b=5, c=1, max_bits=256, max_steps=2000)
+        for shards in (1, 4):
+            assert search_records(1, 300, kind, b=5, c=1, shards=shards, processes=1,
+                                  max_steps=2000, max_bits=256) == expected, kind
+
+def check_known_values():
+    delay = [n for n, _ in search_records(1, 1000, "delay")]
+    assert delay[-4:] == [327, 649, 703, 871]
+    assert [n for n, _ in search_records(1, 40000, "glide")] == [2, 3, 7, 27, 703, 10087, 35655]
+
+check_matches_brute_force()
+check_step_limit()
+check_divergent_rule()
+check_known_values()
+print("OK")
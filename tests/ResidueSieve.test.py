@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from collatz_box.sieve import ResidueSieve, get_sieve, stopping_time, sweep_stopping_times
+
+def check_against_brute_force():
+    # Discarded starts above the threshold drop within k steps; survivors never do
+    for b, c, k in ((3, 1, 10), (3, -1, 9), (5, 1, 8)):
+        sieve = ResidueSieve.build(b, c, k)
+        for n in range(1, 1 << (k + 3)):
+            st = stopping_time(n, b, c, 2000)
+            if not sieve.survives(n):
+                assert st is not None and st <= k, (b, c, k, n)
+            elif n >= sieve.threshold:
+                assert st is None or st > k, (b, c, k, n)
+        assert list(sieve.starts(3, 5000)) == [n for n in range(3, 5000) if sieve.survives(n)]
+
+def check_disk_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        built = get_sieve(3, 1, 11, cache_dir=tmp)
+        loaded = ResidueSieve.load(os.path.join(tmp, "sieve_b3_c1_k11.bin"))
+        assert (loaded.bits, loaded.threshold) == (built.bits, built.threshold)
+        # A truncated file is rejected and rebuilt, not read as a short bitset
+        path = os.path.join(tmp, "sieve_b3_c1_k10.bin")
+        ResidueSieve.build(3, 1, 10).save(path)
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 5)
+        try:
+            ResidueSieve.load(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("truncated sieve accepted")
+        assert get_sieve(3, 1, 10, cache_dir=tmp).bits == ResidueSieve.build(3, 1, 10).bits
+        assert len(ResidueSieve.load(path).bits) == len(ResidueSieve.build(3, 1, 10).bits)
+
+def check_sweep_skips_only_short_stopping_times():
+    sieve = ResidueSieve.build(3, 1, 12)
+    kept = dict(sweep_stopping_times(1, 20000, sieve=sieve))
+    assert len(kept) < 20000
+    for n in range(1, 20000):
+        if n not in kept:
+            assert stopping_time(n) <= 12, n
+
+check_against_brute_force()
+check_disk_cache()
+check_sweep_skips_only_short_stopping_times()
+print("OK")
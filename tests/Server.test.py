@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from collatz_box.server import BadRequest, Job, JobServer, make_handler, plan_job
+
+def check_plan_job():
+    key, units = plan_job("/sweep", {"n": ["27"], "x": ["2..4"], "y": ["3"], "z": ["1..2"]})
+    assert key[0] == "sweep" and len(units) == 3
+    for path, params in [
+        ("/sweep", {"n": ["27"], "x": ["5..2"], "y": ["3"], "z": ["1"]}),
+        ("/sweep", {"n": ["27"], "x": ["1..200"], "y": ["1..200"], "z": ["1..200"]}),
+        ("/sweep", {"n": ["27"], "x": ["a..b"], "y": ["3"], "z": ["1"]}),
+        ("/sweep", {"n": ["27"], "x": ["2"], "y": ["3"], "z": ["1"], "max_bits": ["100000000"]}),
+        ("/sweep", {"n": ["27"], "x": ["2"], "y": ["3"], "z": ["1"], "max_iterations": ["0"]}),
+        ("/tile", {"n": ["27"], "tx": ["0"], "ty": ["0"], "tz": ["0"],
+                   "max_iterations": [str(1 << 32)]}),
+        ("/slicer", {"n": ["27"], "bounds": ["1000,1000,1000"]}),
+        ("/tree", {"depth": ["99"]}),
+    ]:
+        try:
+            plan_job(path, params)
+        except BadRequest:
+            pass
+        else:
+            raise AssertionError(f"{path} {params} accepted")
+    try:
+        plan_job("/nope", {})
+    except LookupError:
+        pass
+    else:
+        raise AssertionError("unknown path accepted")
+
+async def fetch(port, target):
+    # (status, body) once the server closes the connection
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    data = await asyncio.wait_for(reader.read(), timeout=60)
+    writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    return int(head.split()[1]), body
+
+def ndjson_lines(body):
+    # Undo chunked transfer encoding, one JSON value per line
+    out = b""
+    while True:
+        size, _, body = body.partition(b"\r\n")
+        size = int(size, 16)
+        if size == 0:
+            break
+        out += body[:size]
+        body = body[size + 2:]
+    return [json.loads(line) for line in out.splitlines()]
+
+async def check_cache_is_bounded_by_bytes():
+    server = JobServer(workers=1, cache_bytes=100)
+    for name, size in (("a", 40), ("b", 40), ("c", 40), ("huge", 500)):
+        job = Job(name, [])
+        await job.publish(chunk=b"x" * size, done=True)
+        server._remember(job)
+    assert list(server.cache) == ["b", "c"] and server.cached_bytes == 80
+
+async def until(condition):
+    # Poll server state instead of guessing how long a step takes
+    for _ in range(2000):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("server never reached the expected state")
+
+async def check_round_trip():
+    # One worker and a one-slot queue: while the slow tree job runs, a
+    # second job fills the queue and a third is turned away.
+    server = JobServer(workers=1, max_queued=1)
+    await server.start()
+    listener = await asyncio.start_server(make_handler(server), "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        slow = "/tree?root=1&depth=36"
+        first = asyncio.create_task(fetch(port, slow))
+        # Running: taken off the queue by the only runner, still in flight
+        await until(lambda: len(server.in_flight) == 1 and server.queue.qsize() == 0)
+        twin = asyncio.create_task(fetch(port, slow))
+        await until(lambda: server.stats["coalesced"] == 1)
+        queued = asyncio.create_task(fetch(port, "/tree?root=1&depth=5"))
+        await until(lambda: server.queue.qsize() == 1)
+        status, body = await fetch(port, "/tree?root=1&depth=6")
+        assert status == 503, status
+        assert not first.done(), "slow job finished before the queue filled"
+
+        (s1, b1), (s2, b2), (s3, b3) = await asyncio.gather(first, twin, queued)
+        assert s1 == s2 == s3 == 200
+        assert b1 == b2 and ndjson_lines(b1)[0]
+        assert ndjson_lines(b3)[0]
+
+        status, body = await fetch(port, slow)
+        assert status == 200 and body == b1
+
+        assert (await fetch(port, "/sweep?n=27&x=5..2&y=3&z=1"))[0] == 400
+        assert (await fetch(port, "/nope"))[0] == 404
+        status, body = await fetch(port, "/status")
+        stats = json.loads(body)
+        assert stats["coalesced"] == 1 and stats["cache_hits"] == 1, stats
+        assert stats["rejected"] == 1, stats
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        await server.stop()
+
+if __name__ == "__main__":
+    check_plan_job()
+    asyncio.run(check_cache_is_bounded_by_bytes())
+    asyncio.run(check_round_trip())
+    print("OK")
@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from collatz_box.rules import CYCLE, rule_outcome
+from collatz_box.tiles import OUTCOME_NAMES, RulePyramid
+
+def check_cells_match_rule_outcome(root):
+    pyramid = RulePyramid(27, root=root, size=4)
+    for x, y, z, code, steps, cycle in pyramid.view(0, (-5, 20), (1, 9), (-3, 7)):
+        expected = rule_outcome(27, x, y, z)
+        assert OUTCOME_NAMES[code] == expected["type"] and steps == expected["steps"], (x, y, z)
+        assert (cycle is not None) == (expected["type"] == CYCLE)
+
+def check_coarse_cells_summarise_children(root):
+    pyramid = RulePyramid(27, root=root, size=4)
+    # Level 1: dominant code and step range of the 2x2x2 level-0 block
+    tile = pyramid.tile(1, (0, 0, 0))
+    for i in range(4):
+        for j in range(4):
+            for k in range(4):
+                x, y, z = tile.rule(i, j, k)
+                block = [pyramid.tile(0, (a // 4, b // 4, c // 4)).cell(a % 4, b % 4, c % 4)
+                         for a in (x, x + 1) for b in (y, y + 1) for c in (z, z + 1)]
+                codes = [code for code, _, _ in block]
+                code, steps, cycle = tile.cell(i, j, k)
+                assert codes.count(code) == max(codes.count(v) for v in codes), (x, y, z)
+                assert steps == max(s for _, s, _ in block), (x, y, z)
+                assert tile.min_steps[(i * 4 + j) * 4 + k] == min(s for _, s, _ in block)
+                assert (cycle is not None) == (OUTCOME_NAMES[code] == CYCLE)
+                if cycle is not None:
+                    assert cycle in [c for _, _, c in block]
+    # Level 2: the step range spans every rule underneath, odd y included
+    tile = pyramid.tile(2, (0, 0, 0))
+    for i, j, k in ((0, 0, 0), (0, 1, 2), (3, 2, 1)):
+        x, y, z = tile.rule(i, j, k)
+        results = [rule_outcome(27, a, b, c) for a in range(x, x + 4)
+                   for b in range(y, y + 4) for c in range(z, z + 4)]
+        code, steps, cycle = tile.cell(i, j, k)
+        assert steps == max(r["steps"] for r in results)
+        assert tile.min_steps[(i * 4 + j) * 4 + k] == min(r["steps"] for r in results)
+
+def check_lazy_and_persistent(root):
+    pyramid = RulePyramid(7, root=root, size=4)
+    assert not pyramid.has_tile(0, (1, 1, 0))
+    assert pyramid.build(0, (4, 11), (4, 7), (0, 3), processes=1) == 2
+    assert pyramid.build(0, (4, 11), (4, 7), (0, 3), processes=1) == 0
+    assert pyramid.build(1, (0, 15), (0, 7), (0, 7), processes=2) == 2
+    assert all(pyramid.has_tile(0, child) for child in [(3, 1, 1), (2, 0, 0)])
+    reopened = RulePyramid(7, root=root, size=4)
+    assert reopened.tile(0, (1, 1, 0)).to_dict() == pyramid.tile(0, (1, 1, 0)).to_dict()
+    try:
+        RulePyramid(7, root=root, size=8)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("manifest mismatch not detected")
+
+with tempfile.TemporaryDirectory() as tmp:
+    check_cells_match_rule_outcome(os.path.join(tmp, "a"))
+    check_coarse_cells_summarise_children(os.path.join(tmp, "a"))
+    check_lazy_and_persistent(os.path.join(tmp, "b"))
+print("OK")